@@ -0,0 +1,100 @@
+import copy
+
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+from rest_framework.response import Response
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, models, transaction
+from django.http import Http404
+
+# Serializer and viewset helpers shared by the app APIs
+
+class CachedFieldsMixin:
+    """Build the ModelSerializer field map once per class and hand each instance copies of it"""
+    _fields_cache = {}
+    
+    def get_fields(self):
+        cls = self.__class__
+        if cls not in CachedFieldsMixin._fields_cache:
+            CachedFieldsMixin._fields_cache[cls] = super().get_fields()
+        return {name: self._copy_field(field) for name, field in CachedFieldsMixin._fields_cache[cls].items()}
+    
+    @staticmethod
+    def _copy_field(field):
+        # Fields wrapping a child (many=True relations, lists, nested serializers) share state through it
+        if hasattr(field, 'child_relation') or hasattr(field, 'child') or isinstance(field, serializers.BaseSerializer):
+            return copy.deepcopy(field)
+        return copy.copy(field)
+
+class BulkListSerializer(serializers.ListSerializer):
+    """Serialize a page of rows with the child's readable fields resolved once, not once per row"""
+    
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        # Same per-field steps as Serializer.to_representation, with the bound methods looked up up front
+        fields = [
+            (field.field_name, field.get_attribute, field.to_representation)
+            for field in self.child._readable_fields
+        ]
+        rows = []
+        for instance in iterable:
+            row = {}
+            for name, get_attribute, to_representation in fields:
+                try:
+                    attribute = get_attribute(instance)
+                except SkipField:
+                    continue
+                check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+                row[name] = None if check_for_none is None else to_representation(attribute)
+            rows.append(row)
+        return rows
+
+class ConstraintErrorsMixin:
+    """Report the database's CHECK constraint violations as field errors, via the model's constraint_error_detail()"""
+    
+    def create(self, validated_data):
+        return self._translate_constraint_errors(super().create, validated_data)
+    
+    def update(self, instance, validated_data):
+        return self._translate_constraint_errors(super().update, instance, validated_data)
+    
+    def _translate_constraint_errors(self, save, *args):
+        try:
+            with transaction.atomic(): return save(*args)
+        except IntegrityError as e:
+            detail = self.Meta.model.constraint_error_detail(e)
+            if detail: raise serializers.ValidationError(detail)
+            raise
+
+class EagerLoadingMixin:
+    """Declared select_related/prefetch_related applied to the base queryset, so no filter branch can drop them"""
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    
+    def get_base_queryset(self):
+        queryset = super().get_queryset()
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset
+
+class PaginatedActionMixin:
+    """Lets custom list actions page their results like the default list view"""
+    
+    def paginated_response(self, queryset):
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+class PkFilterMixin:
+    """Narrows the queryset to the URL's pk for single-UPDATE actions, with get_object()'s 404 on a malformed pk"""
+    
+    def filter_pk(self, pk):
+        queryset = self.get_queryset()
+        try:
+            return queryset.filter(pk=queryset.model._meta.pk.to_python(pk))
+        except DjangoValidationError:
+            raise Http404
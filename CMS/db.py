@@ -0,0 +1,25 @@
+# Database error helpers shared by the app models and serializers
+
+# MySQL's ER_DUP_ENTRY; Django's IntegrityError keeps the driver's (errno, message) args
+MYSQL_DUPLICATE_ENTRY = 1062
+
+
+def is_duplicate_key(error, index_name):
+    """
+    Whether an IntegrityError is the unique index `index_name` rejecting a duplicate.
+
+    Decided by the backend's duplicate-key signal rather than by the column appearing anywhere
+    in the message, which a foreign key or CHECK failure on the same column also produces.
+    A unique=True column's index is named after the column on both MySQL and SQLite.
+    """
+    if error.args and error.args[0] == MYSQL_DUPLICATE_ENTRY:
+        # "Duplicate entry '...' for key '<table>.<index>'" (8.0.19+) or "... for key '<index>'"
+        key = str(error.args[-1]).rsplit(' for key ', 1)[-1].strip("'")
+        return key.rsplit('.', 1)[-1] == index_name
+    # SQLite: "UNIQUE constraint failed: <table>.<column>, ..." or "... failed: index '<name>'"
+    message = str(error)
+    prefix = 'UNIQUE constraint failed: '
+    if not message.startswith(prefix):
+        return False
+    targets = message[len(prefix):].split(', ')
+    return any(target.rsplit('.', 1)[-1].strip("'") == index_name for target in targets)
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django import forms
 from django.core.exceptions import ValidationError
-from .models import Staff
+from .models import Staff, ALLOWED_EMAIL_DOMAINS, ALLOWED_DOMAINS_MSG, INVALID_NAME_SEQUENCE_RE
 
 class StaffAdminForm(forms.ModelForm):
     class Meta:
@@ -12,15 +12,14 @@ class StaffAdminForm(forms.ModelForm):
         name = self.cleaned_data.get('full_name')
         if not name or len(name.strip()) < 2: raise ValidationError('Name must be at least 2 characters long')
         if len(name) > 100: raise ValidationError('Name cannot exceed 100 characters')
-        if '  ' in name or '..' in name or '--' in name: raise ValidationError('Name contains invalid character sequences')
+        if INVALID_NAME_SEQUENCE_RE.search(name): raise ValidationError('Name contains invalid character sequences')
         return name.strip()
     
     def clean_email(self):
         email = self.cleaned_data.get('email')
-        allowed_domains = ['hospital.com', 'gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com']
         email_domain = email.split('@')[-1].lower() if '@' in email else ''
-        if email_domain not in allowed_domains: raise ValidationError(f'Email domain must be one of: {", ".join(allowed_domains)}')
-        return email.lower()
+        if email_domain not in ALLOWED_EMAIL_DOMAINS: raise ValidationError(ALLOWED_DOMAINS_MSG)
+        return email
 
 @admin.register(Staff)
 class StaffAdmin(admin.ModelAdmin):
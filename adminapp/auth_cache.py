@@ -0,0 +1,77 @@
+"""Short-lived in-process cache of verified credentials so repeat logins skip the password hasher"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+TOKEN_CREDENTIAL_TTL = 60  # seconds; bounds how long a revoked password keeps working on one worker
+TOKEN_CREDENTIAL_MAXSIZE = 1024
+STAFF_PASSWORD_TTL = 300
+STAFF_PASSWORD_MAXSIZE = 4096
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries expire after `ttl` seconds"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def credential_key(identifier, raw_password):
+    """Keyed digest of a credential pair; the raw password never sits in memory as a dict key"""
+    return hashlib.blake2b(
+        f"{identifier}:{raw_password}".encode(),
+        key=settings.SECRET_KEY.encode()[:64],
+        digest_size=32,
+    ).digest()
+
+
+def password_check_key(encoded_password, raw_password):
+    """Keyed digest of a raw password bound to the stored hash it was verified against"""
+    return hashlib.blake2b(
+        f"{encoded_password}:{raw_password}".encode(),
+        key=settings.SECRET_KEY.encode()[:64],
+        digest_size=16,
+    ).digest()
+
+
+def password_fingerprint(encoded_password):
+    """Fingerprint of a stored hash; it changes whenever the password is reset"""
+    return hashlib.blake2b((encoded_password or '').encode(), digest_size=16).digest()
+
+
+token_credentials = TTLCache(maxsize=TOKEN_CREDENTIAL_MAXSIZE, ttl=TOKEN_CREDENTIAL_TTL)
+# Positive Staff.check_password results; a new hash yields new keys, so resets need no purge
+staff_passwords = TTLCache(maxsize=STAFF_PASSWORD_MAXSIZE, ttl=STAFF_PASSWORD_TTL)
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['role', 'is_active'], name='adminapp_st_role_e2b5c2_idx'),
+        ),
+    ]
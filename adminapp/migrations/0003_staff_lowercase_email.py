@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:29
+
+import adminapp.models
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    Staff = apps.get_model('adminapp', 'Staff')
+    Staff.objects.update(email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapp', '0002_staff_adminapp_st_role_e2b5c2_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='staff',
+            name='email',
+            field=adminapp.models.LowercaseEmailField(help_text='Enter a valid email address', max_length=254, unique=True),
+        ),
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+    ]
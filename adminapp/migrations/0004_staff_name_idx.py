@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapp', '0003_staff_lowercase_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['full_name'], name='staff_name_idx'),
+        ),
+    ]
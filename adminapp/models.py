@@ -1,9 +1,46 @@
+import re
+
 from django.db import models
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from django.contrib.auth.hashers import make_password, check_password
 from django.utils import timezone
 
+from .auth_cache import password_check_key, staff_passwords
+
+# One pass over the password; the per-rule checks only run to explain a failure
+PASSWORD_RE = re.compile(r'(?=.*\d)(?=.*[A-Za-z]).{8,}', re.ASCII | re.DOTALL)
+STRICT_PASSWORD_RE = re.compile(r'(?=.*\d)(?=.*[a-z])(?=.*[A-Z])[^ ]{8,}', re.ASCII | re.DOTALL)
+
+_EMAIL_DOMAINS = ('hospital.com', 'gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com')
+ALLOWED_EMAIL_DOMAINS = frozenset(_EMAIL_DOMAINS)
+ALLOWED_DOMAINS_MSG = f'Email domain must be one of: {", ".join(_EMAIL_DOMAINS)}'
+INVALID_NAME_SEQUENCE_RE = re.compile(r'  |\.\.|--')
+
+# Logins closer together than this share one last_login write
+LAST_LOGIN_WRITE_INTERVAL = timezone.timedelta(seconds=60)
+
+
+def touch_last_login(user):
+    """Stamp last_login with one conditional UPDATE, skipped if it was stamped very recently"""
+    now = timezone.now()
+    stale = models.Q(last_login__isnull=True) | models.Q(last_login__lt=now - LAST_LOGIN_WRITE_INTERVAL)
+    if type(user)._default_manager.filter(stale, pk=user.pk).update(last_login=now):
+        user.last_login = now
+
+
+class LowercaseEmailField(models.EmailField):
+    """Email column folded to lower case on the way in, for writes and lookups alike"""
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        return value.lower() if isinstance(value, str) else value
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        return value.lower() if isinstance(value, str) else value
+
+
 class Staff(models.Model):
     ROLE_CHOICES = [
         ('ADMIN', 'Admin'),
@@ -24,7 +61,7 @@ class Staff(models.Model):
         help_text="Enter full name (2-100 characters)"
     )
     
-    email = models.EmailField(
+    email = LowercaseEmailField(
         unique=True,
         help_text="Enter a valid email address"
     )
@@ -62,20 +99,24 @@ class Staff(models.Model):
         verbose_name = "Staff"
         verbose_name_plural = "Staff"
         ordering = ['full_name']
+        indexes = [
+            models.Index(fields=['role', 'is_active']),
+            # Backs the default ordering; MySQL's collation already sorts case-insensitively
+            models.Index(fields=['full_name'], name='staff_name_idx'),
+        ]
 
     def set_password(self, raw_password):
         """Hash and set the password"""
         if not raw_password:
             raise ValidationError('Password cannot be empty')
         
-        if len(raw_password) < 8:
-            raise ValidationError('Password must be at least 8 characters long')
-        
-        if not any(char.isdigit() for char in raw_password):
-            raise ValidationError('Password must contain at least one digit')
-        
-        if not any(char.isalpha() for char in raw_password):
-            raise ValidationError('Password must contain at least one letter')
+        if not PASSWORD_RE.fullmatch(raw_password):
+            if len(raw_password) < 8:
+                raise ValidationError('Password must be at least 8 characters long')
+            if not any(char.isdigit() for char in raw_password):
+                raise ValidationError('Password must contain at least one digit')
+            if not any(char.isalpha() for char in raw_password):
+                raise ValidationError('Password must contain at least one letter')
         
         self.password = make_password(raw_password)
 
@@ -83,23 +124,28 @@ class Staff(models.Model):
         """Check if the raw password matches the hashed one"""
         if not raw_password or not self.password:
             return False
-        return check_password(raw_password, self.password)
+        key = password_check_key(self.password, raw_password)
+        if staff_passwords.get(key):
+            return True
+        # Failures are never cached, so a wrong guess always pays the full hasher
+        if not check_password(raw_password, self.password):
+            return False
+        staff_passwords.set(key, True)
+        return True
 
     def update_last_login(self):
         """Update last login timestamp"""
-        self.last_login = timezone.now()
-        self.save(update_fields=['last_login'])
+        touch_last_login(self)
 
     def clean(self):
         """Additional model-level validation"""
         errors = {}
         
         # Email domain validation (optional - you might want to remove this)
-        allowed_domains = ['hospital.com', 'gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com']
-        if allowed_domains:
+        if ALLOWED_EMAIL_DOMAINS:
             email_domain = self.email.split('@')[-1] if '@' in self.email else ''
-            if email_domain.lower() not in allowed_domains:
-                errors['email'] = f'Please use an email from allowed domains: {", ".join(allowed_domains)}'
+            if email_domain.lower() not in ALLOWED_EMAIL_DOMAINS:
+                errors['email'] = f'Please use an email from allowed domains: {", ".join(_EMAIL_DOMAINS)}'
         
         # Name format validation
         if not self.full_name or len(self.full_name.strip()) == 0:
@@ -110,7 +156,7 @@ class Staff(models.Model):
                 errors['full_name'] = 'Please enter a valid name'
             
             # Validate name doesn't contain multiple special characters in a row
-            if '  ' in self.full_name or '..' in self.full_name or '--' in self.full_name:
+            if INVALID_NAME_SEQUENCE_RE.search(self.full_name):
                 errors['full_name'] = 'Name contains invalid character sequences'
         
         # Check if password is set for new instances
@@ -120,13 +166,33 @@ class Staff(models.Model):
         if errors:
             raise ValidationError(errors)
 
-    def save(self, *args, **kwargs):
-        """Override save to run full validation"""
+    # Name as last read from or written to the database, so a rename can be copied to appointments
+    _loaded_full_name = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_full_name = instance.__dict__.get('full_name')
+        return instance
+
+    def save(self, *args, skip_validation=False, **kwargs):
+        """Override save to run full validation unless the caller already did"""
         # Don't auto-hash password here to avoid double hashing
         # Password should be set using set_password method
         
-        self.full_clean()
+        if not skip_validation:
+            self.full_clean()
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        
+        update_fields = kwargs.get('update_fields')
+        if not adding and self.full_name != self._loaded_full_name and (
+            update_fields is None or 'full_name' in update_fields
+        ):
+            # Appointments keep a copy of the doctor's name for list views
+            from receptionist.models import Appointment
+            Appointment.objects.filter(doctor_id=self.pk).update(doctor_name_cached=self.full_name)
+        self._loaded_full_name = self.full_name
 
     def __str__(self):
         status = "Active" if self.is_active else "Inactive"
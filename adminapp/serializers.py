@@ -1,38 +1,48 @@
 from rest_framework import serializers
-from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from django.core.validators import EmailValidator
-from .models import Staff
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from CMS.db import is_duplicate_key
+from .models import Staff, STRICT_PASSWORD_RE, ALLOWED_EMAIL_DOMAINS, ALLOWED_DOMAINS_MSG, INVALID_NAME_SEQUENCE_RE, touch_last_login
+from .auth_cache import token_credentials, credential_key, password_fingerprint
 
 class StaffSerializer(serializers.ModelSerializer):
-    password = serializers.CharField(write_only=True, min_length=8, style={'input_type': 'password'})
-    email = serializers.EmailField(validators=[EmailValidator(message="Enter a valid email address")])
+    full_name = serializers.CharField(error_messages={'required': 'Full name is required', 'blank': 'Name cannot be empty'})
+    password = serializers.CharField(write_only=True, min_length=8, style={'input_type': 'password'}, error_messages={'required': 'Password is required for new staff'})
+    email = serializers.EmailField(validators=[EmailValidator(message="Enter a valid email address")], error_messages={'required': 'Email is required'})
+    role = serializers.ChoiceField(choices=Staff.ROLE_CHOICES, error_messages={'required': 'Role is required', 'invalid_choice': f'Role must be one of: {", ".join(choice[0] for choice in Staff.ROLE_CHOICES)}'})
     
     class Meta:
         model = Staff
         fields = ['id', 'full_name', 'email', 'role', 'password', 'is_active', 'date_joined', 'last_login']
         read_only_fields = ['date_joined', 'last_login']
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Required fields are enforced by DRF before any validate_* hook; only new staff must send a password
+        self.fields['password'].required = self.instance is None
+    
     def validate_full_name(self, value):
         if not value or len(value.strip()) == 0: raise serializers.ValidationError('Name cannot be empty')
-        name_validator = RegexValidator(regex=r'^[a-zA-ZÀ-ÿ\s\'\-\.]{2,100}$', message='Name must contain only letters, spaces, apostrophes, hyphens and dots (2-100 characters)')
-        try: name_validator(value)
+        try: Staff.name_validator(value)
         except ValidationError as e: raise serializers.ValidationError(e.message)
-        if '  ' in value or '..' in value or '--' in value: raise serializers.ValidationError('Name contains invalid character sequences')
+        if INVALID_NAME_SEQUENCE_RE.search(value): raise serializers.ValidationError('Name contains invalid character sequences')
         if len(value.strip()) < 2: raise serializers.ValidationError('Name must be at least 2 characters long')
         if len(value) > 100: raise serializers.ValidationError('Name cannot exceed 100 characters')
         return value.strip()
     
     def validate_email(self, value):
         if not value: raise serializers.ValidationError('Email cannot be empty')
-        allowed_domains = ['hospital.com', 'gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com']
         email_domain = value.split('@')[-1].lower() if '@' in value else ''
-        if email_domain not in allowed_domains: raise serializers.ValidationError(f'Email domain must be one of: {", ".join(allowed_domains)}')
-        if Staff.objects.filter(email=value).exclude(pk=self.instance.pk if self.instance else None).exists(): raise serializers.ValidationError('Email already exists')
-        return value.lower()
+        if email_domain not in ALLOWED_EMAIL_DOMAINS: raise serializers.ValidationError(ALLOWED_DOMAINS_MSG)
+        return value
     
     def validate_password(self, value):
         if not value: raise serializers.ValidationError('Password cannot be empty')
+        if STRICT_PASSWORD_RE.fullmatch(value): return value
         if len(value) < 8: raise serializers.ValidationError('Password must be at least 8 characters long')
         if not any(char.isdigit() for char in value): raise serializers.ValidationError('Password must contain at least one digit')
         if not any(char.isalpha() for char in value): raise serializers.ValidationError('Password must contain at least one letter')
@@ -41,28 +51,49 @@ class StaffSerializer(serializers.ModelSerializer):
         if ' ' in value: raise serializers.ValidationError('Password cannot contain spaces')
         return value
     
-    def validate_role(self, value):
-        valid_roles = [choice[0] for choice in Staff.ROLE_CHOICES]
-        if value not in valid_roles: raise serializers.ValidationError(f'Role must be one of: {", ".join(valid_roles)}')
-        return value
-    
-    def validate(self, data):
-        if not data.get('full_name'): raise serializers.ValidationError({'full_name': 'Full name is required'})
-        if not data.get('email'): raise serializers.ValidationError({'email': 'Email is required'})
-        if not data.get('role'): raise serializers.ValidationError({'role': 'Role is required'})
-        if self.instance is None and not data.get('password'): raise serializers.ValidationError({'password': 'Password is required for new staff'})
-        return data
-    
     def create(self, validated_data):
         password = validated_data.pop('password')
         staff = Staff(**validated_data)
         staff.set_password(password)
-        staff.save()
+        self._save_staff(staff)
         return staff
     
     def update(self, instance, validated_data):
         password = validated_data.pop('password', None)
         for attr, value in validated_data.items(): setattr(instance, attr, value)
         if password: instance.set_password(password)
-        instance.save()
-        return instance
\ No newline at end of file
+        self._save_staff(instance)
+        return instance
+    
+    def _save_staff(self, staff):
+        # The UNIQUE index on email replaces the pre-check SELECT and closes the race between two writes
+        staff.full_clean(validate_unique=False)
+        try:
+            with transaction.atomic(): staff.save(skip_validation=True)
+        except IntegrityError as e:
+            if is_duplicate_key(e, 'email'): raise serializers.ValidationError({'email': 'Email already exists'})
+            raise
+
+class CachedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Token pair serializer that skips the password hasher for recently verified credentials"""
+    
+    def validate(self, attrs):
+        key = credential_key(attrs.get(self.username_field), attrs.get('password'))
+        cached = token_credentials.get(key)
+        if cached:
+            user_id, fingerprint = cached
+            user = get_user_model().objects.filter(pk=user_id).first()
+            # A changed password hash or deactivated user invalidates the entry
+            if user and password_fingerprint(user.password) == fingerprint and api_settings.USER_AUTHENTICATION_RULE(user):
+                self.user = user
+                return self.issue_tokens()
+            token_credentials.discard(key)
+        data = super().validate(attrs)
+        # Only successful logins are cached
+        token_credentials.set(key, (self.user.pk, password_fingerprint(self.user.password)))
+        return data
+    
+    def issue_tokens(self):
+        refresh = self.get_token(self.user)
+        if api_settings.UPDATE_LAST_LOGIN: touch_last_login(self.user)
+        return {'refresh': str(refresh), 'access': str(refresh.access_token)}
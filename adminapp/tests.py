@@ -1,3 +1,27 @@
+from django.db import IntegrityError
 from django.test import TestCase
+from rest_framework import serializers
 
-# Create your tests here.
+from CMS.db import is_duplicate_key
+from .serializers import StaffSerializer
+
+
+class StaffSerializerTests(TestCase):
+    def create_staff(self, email):
+        serializer = StaffSerializer(data={
+            'full_name': 'Asha Menon', 'email': email, 'role': 'RECEPTIONIST', 'password': 'Passw0rdX',
+        })
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def test_duplicate_email_is_a_field_error(self):
+        self.create_staff('asha@hospital.com')
+        with self.assertRaises(serializers.ValidationError) as raised:
+            self.create_staff('ASHA@hospital.com')
+        self.assertEqual(raised.exception.detail, {'email': 'Email already exists'})
+
+    def test_only_the_email_index_counts_as_duplicate_email(self):
+        self.assertTrue(is_duplicate_key(IntegrityError(1062, "Duplicate entry 'a@hospital.com' for key 'adminapp_staff.email'"), 'email'))
+        # A CHECK or foreign key failure whose name mentions email is not a duplicate
+        self.assertFalse(is_duplicate_key(IntegrityError(3819, "Check constraint 'staff_email_lower' is violated."), 'email'))
+        self.assertFalse(is_duplicate_key(IntegrityError('CHECK constraint failed: staff_email_lower'), 'email'))
@@ -4,8 +4,14 @@ from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from django.core.exceptions import ValidationError as DjangoValidationError
 from .models import Staff
-from .serializers import StaffSerializer
+from .serializers import StaffSerializer, CachedTokenObtainPairSerializer
 from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+STAFF_READ_FIELDS = ('id', 'full_name', 'email', 'role', 'is_active', 'date_joined', 'last_login')
+# Roles only change with a deploy, so build the payload once and let clients cache it
+ROLES_PAYLOAD = [{'value': choice[0], 'label': choice[1]} for choice in Staff.ROLE_CHOICES]
+ROLES_CACHE_CONTROL = 'private, max-age=86400'
 
 class StaffViewSet(viewsets.ModelViewSet):
     queryset = Staff.objects.all()
@@ -14,11 +20,14 @@ class StaffViewSet(viewsets.ModelViewSet):
 
     
     def get_queryset(self):
-        queryset = Staff.objects.all()
+        # Never pull the password hash for reads; the serializer treats it as write-only
+        queryset = Staff.objects.only(*STAFF_READ_FIELDS).order_by('full_name')
         role = self.request.query_params.get('role')
         is_active = self.request.query_params.get('is_active')
         if role: queryset = queryset.filter(role=role)
-        if is_active: queryset = queryset.filter(is_active=is_active.lower() == 'true')
+        if is_active:
+            is_active = {'true': True, 'false': False}.get(is_active.lower())
+            if is_active is not None: queryset = queryset.filter(is_active=is_active)
         return queryset
     
     @action(detail=True, methods=['post'])
@@ -50,5 +59,7 @@ class StaffViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def roles(self, request):
-        roles = [{'value': choice[0], 'label': choice[1]} for choice in Staff.ROLE_CHOICES]
-        return Response(roles)
\ No newline at end of file
+        return Response(ROLES_PAYLOAD, headers={'Cache-Control': ROLES_CACHE_CONTROL})
+
+class CachedTokenObtainPairView(TokenObtainPairView):
+    serializer_class = CachedTokenObtainPairSerializer
@@ -1,31 +1,34 @@
+import copy
+
 from django.contrib import admin
 from django import forms
-from .models import Billing
+from django.db.models import BooleanField, Case, Q, Value, When
+from django.utils import timezone
+from django.core.exceptions import ValidationError
+from django.forms.models import construct_instance
+from .models import Billing, AMOUNT_CONSTRAINT_ERRORS
+
+# Amount CHECK constraint message -> the field the admin shows it under
+CONSTRAINT_MESSAGE_FIELDS = {
+    message: field for detail in AMOUNT_CONSTRAINT_ERRORS.values() for field, message in detail.items()
+}
 
 class BillingAdminForm(forms.ModelForm):
     class Meta:
         model = Billing
         fields = '__all__'
     
-    def clean_consultation_fee(self):
-        fee = self.cleaned_data.get('consultation_fee')
-        if fee < 0: raise forms.ValidationError('Consultation fee cannot be negative')
-        return fee
-    
-    def clean_medicine_cost(self):
-        cost = self.cleaned_data.get('medicine_cost')
-        if cost < 0: raise forms.ValidationError('Medicine cost cannot be negative')
-        return cost
-    
-    def clean_lab_cost(self):
-        cost = self.cleaned_data.get('lab_cost')
-        if cost < 0: raise forms.ValidationError('Lab cost cannot be negative')
-        return cost
-    
-    def clean_other_charges(self):
-        charges = self.cleaned_data.get('other_charges')
-        if charges < 0: raise forms.ValidationError('Other charges cannot be negative')
-        return charges
+    def clean(self):
+        cleaned_data = super().clean()
+        # ModelForm skips constraints on fields the form leaves out, and the generated totals are
+        # read-only here, so the amount CHECKs are validated on a copy of the submitted bill
+        # instead of failing the INSERT
+        try:
+            construct_instance(self, copy.copy(self.instance)).validate_constraints()
+        except ValidationError as e:
+            for message in e.messages:
+                self.add_error(CONSTRAINT_MESSAGE_FIELDS.get(message), message)
+        return cleaned_data
 
 @admin.register(Billing)
 class BillingAdmin(admin.ModelAdmin):
@@ -33,16 +36,24 @@ class BillingAdmin(admin.ModelAdmin):
     list_display = ['bill_number', 'patient', 'total_amount', 'amount_paid', 'balance_due', 'payment_status', 'billing_date', 'is_overdue']
     list_filter = ['payment_status', 'payment_method', 'billing_date', 'due_date']
     search_fields = ['bill_number', 'patient__full_name', 'patient__phone']
-    readonly_fields = ['bill_number', 'total_amount', 'balance_due', 'created_at', 'updated_at']
+    readonly_fields = ['bill_number', 'subtotal', 'total_amount', 'balance_due', 'created_at', 'updated_at']
     fieldsets = (
         ('Basic Info', {'fields': ('bill_number', 'patient', 'prescription', 'lab_requests', 'created_by')}),
-        ('Charges', {'fields': ('consultation_fee', 'medicine_cost', 'lab_cost', 'other_charges')}),
+        ('Charges', {'fields': ('consultation_fee', 'medicine_cost', 'lab_cost', 'other_charges', 'subtotal')}),
         ('Adjustments', {'fields': ('discount', 'tax_amount')}),
         ('Payment', {'fields': ('total_amount', 'amount_paid', 'balance_due', 'payment_status', 'payment_method')}),
         ('Dates', {'fields': ('billing_date', 'due_date', 'payment_date')}),
         ('Additional', {'fields': ('notes', 'created_at', 'updated_at')}),
     )
     
+    def get_queryset(self, request):
+        # Overdue is evaluated by the database once per page instead of per row in Python
+        overdue = Q(due_date__lt=timezone.localdate()) & ~Q(payment_status='PAID')
+        return super().get_queryset(request).select_related('patient', 'created_by').prefetch_related('lab_requests').annotate(
+            is_overdue_db=Case(When(overdue, then=Value(True)), default=Value(False), output_field=BooleanField())
+        )
+    
     def is_overdue(self, obj):
-        return obj.is_overdue
-    is_overdue.boolean = True
\ No newline at end of file
+        return obj.is_overdue_db
+    is_overdue.boolean = True
+    is_overdue.admin_order_field = 'is_overdue_db'
\ No newline at end of file
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:22
+
+import datetime
+
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    """Start each day's counter after the highest bill number already issued"""
+    Billing = apps.get_model('billing', 'Billing')
+    DailyBillSequence = apps.get_model('billing', 'DailyBillSequence')
+    highest = {}
+    for bill_number in Billing.objects.values_list('bill_number', flat=True).iterator():
+        try:
+            _, date_str, seq = bill_number.split('-')
+            day = datetime.datetime.strptime(date_str, '%Y%m%d').date()
+            seq = int(seq)
+        except (AttributeError, ValueError):
+            continue
+        highest[day] = max(seq, highest.get(day, 0))
+    DailyBillSequence.objects.bulk_create(
+        [DailyBillSequence(date=day, seq=seq) for day, seq in highest.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBillSequence',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+                ('seq', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Bill Sequence',
+                'db_table': 'billing_daily_seq',
+            },
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
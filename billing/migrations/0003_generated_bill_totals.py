@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:23
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0002_dailybillsequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='billing',
+            name='subtotal',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('consultation_fee'), '+', models.F('medicine_cost')), '+', models.F('lab_cost')), '+', models.F('other_charges')), help_text='Charges before discount and tax', output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+        # A regular column cannot be altered into a generated one; drop and re-add
+        migrations.RemoveField(
+            model_name='billing',
+            name='balance_due',
+        ),
+        migrations.RemoveField(
+            model_name='billing',
+            name='total_amount',
+        ),
+        migrations.AddField(
+            model_name='billing',
+            name='balance_due',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Greatest(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('consultation_fee'), '+', models.F('medicine_cost')), '+', models.F('lab_cost')), '+', models.F('other_charges')), '-', models.F('discount')), '+', models.F('tax_amount')), models.Value(Decimal('0.00'))), '-', models.F('amount_paid')), help_text='Remaining balance to be paid', output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+        migrations.AddField(
+            model_name='billing',
+            name='total_amount',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Greatest(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('consultation_fee'), '+', models.F('medicine_cost')), '+', models.F('lab_cost')), '+', models.F('other_charges')), '-', models.F('discount')), '+', models.F('tax_amount')), models.Value(Decimal('0.00'))), help_text='Final total amount after calculations', output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapp', '0002_staff_adminapp_st_role_e2b5c2_idx'),
+        ('billing', '0003_generated_bill_totals'),
+        ('doctor', '0001_initial'),
+        ('receptionist', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='billing',
+            name='billing_bil_payment_061d84_idx',
+        ),
+        migrations.AddIndex(
+            model_name='billing',
+            index=models.Index(fields=['payment_status', 'due_date'], name='bill_overdue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='billing',
+            index=models.Index(fields=['payment_status', 'payment_date'], name='bill_paid_date_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapp', '0004_staff_name_idx'),
+        ('billing', '0004_billing_status_indexes'),
+        ('doctor', '0001_initial'),
+        ('receptionist', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='billing',
+            constraint=models.CheckConstraint(condition=models.Q(('consultation_fee__gte', 0)), name='billing_consultation_fee_nonneg', violation_error_message='Consultation fee cannot be negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='billing',
+            constraint=models.CheckConstraint(condition=models.Q(('medicine_cost__gte', 0)), name='billing_medicine_cost_nonneg', violation_error_message='Medicine cost cannot be negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='billing',
+            constraint=models.CheckConstraint(condition=models.Q(('lab_cost__gte', 0)), name='billing_lab_cost_nonneg', violation_error_message='Lab cost cannot be negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='billing',
+            constraint=models.CheckConstraint(condition=models.Q(('other_charges__gte', 0)), name='billing_other_charges_nonneg', violation_error_message='Other charges cannot be negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='billing',
+            constraint=models.CheckConstraint(condition=models.Q(('discount__gte', 0)), name='billing_discount_nonneg', violation_error_message='Discount cannot be negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='billing',
+            constraint=models.CheckConstraint(condition=models.Q(('tax_amount__gte', 0)), name='billing_tax_amount_nonneg', violation_error_message='Tax amount cannot be negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='billing',
+            constraint=models.CheckConstraint(condition=models.Q(('amount_paid__lte', models.F('total_amount'))), name='billing_paid_within_total', violation_error_message='Amount paid cannot exceed total amount'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:35
+
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0005_billing_amount_checks'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='billing',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=0.0, help_text='Amount paid by patient', max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.00'), message='Amount paid cannot be negative')]),
+        ),
+        migrations.AlterField(
+            model_name='billing',
+            name='consultation_fee',
+            field=models.DecimalField(decimal_places=2, default=300.0, help_text='Consultation fee', max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.00'), message='Consultation fee cannot be negative')]),
+        ),
+        migrations.AlterField(
+            model_name='billing',
+            name='discount',
+            field=models.DecimalField(decimal_places=2, default=0.0, help_text='Discount amount', max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.00'), message='Discount cannot be negative')]),
+        ),
+        migrations.AlterField(
+            model_name='billing',
+            name='lab_cost',
+            field=models.DecimalField(decimal_places=2, default=0.0, help_text='Total laboratory test costs', max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.00'), message='Lab cost cannot be negative')]),
+        ),
+        migrations.AlterField(
+            model_name='billing',
+            name='medicine_cost',
+            field=models.DecimalField(decimal_places=2, default=0.0, help_text='Total medicine cost', max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.00'), message='Medicine cost cannot be negative')]),
+        ),
+        migrations.AlterField(
+            model_name='billing',
+            name='other_charges',
+            field=models.DecimalField(decimal_places=2, default=0.0, help_text='Other miscellaneous charges', max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.00'), message='Other charges cannot be negative')]),
+        ),
+        migrations.AlterField(
+            model_name='billing',
+            name='tax_amount',
+            field=models.DecimalField(decimal_places=2, default=0.0, help_text='Tax amount', max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.00'), message='Tax amount cannot be negative')]),
+        ),
+    ]
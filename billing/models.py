@@ -1,6 +1,83 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Concat, Greatest, TruncDate
 from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
 from django.utils import timezone
+from django.utils.functional import cached_property
+from decimal import Decimal
+
+# Computed by the database on every row write (see Billing.subtotal/total_amount/balance_due)
+SUBTOTAL_EXPRESSION = F('consultation_fee') + F('medicine_cost') + F('lab_cost') + F('other_charges')
+TOTAL_EXPRESSION = Greatest(SUBTOTAL_EXPRESSION - F('discount') + F('tax_amount'), Value(Decimal('0.00')))
+GENERATED_AMOUNT_FIELDS = ['subtotal', 'total_amount', 'balance_due']
+# Columns the generated amounts are computed from
+AMOUNT_INPUT_FIELDS = (
+    'consultation_fee', 'medicine_cost', 'lab_cost', 'other_charges', 'discount', 'tax_amount', 'amount_paid',
+)
+REVENUE_FIELD = models.DecimalField(max_digits=14, decimal_places=2)
+OVERDUE_CACHED_PROPERTIES = ('is_overdue', 'days_overdue')
+NON_NEGATIVE_AMOUNTS = (
+    ('consultation_fee', 'Consultation fee cannot be negative'),
+    ('medicine_cost', 'Medicine cost cannot be negative'),
+    ('lab_cost', 'Lab cost cannot be negative'),
+    ('other_charges', 'Other charges cannot be negative'),
+    ('discount', 'Discount cannot be negative'),
+    ('tax_amount', 'Tax amount cannot be negative'),
+)
+PAID_WITHIN_TOTAL_MESSAGE = 'Amount paid cannot exceed total amount'
+# CHECK constraint name -> field error, for turning IntegrityErrors back into validation errors
+AMOUNT_CONSTRAINT_ERRORS = {
+    **{f'billing_{field}_nonneg': {field: message} for field, message in NON_NEGATIVE_AMOUNTS},
+    'billing_paid_within_total': {'amount_paid': PAID_WITHIN_TOTAL_MESSAGE},
+}
+PAYMENT_FIELDS = ['amount_paid', 'payment_status', 'payment_date', 'payment_method', 'notes']
+
+
+def revenue_sum(condition=None):
+    """Sum of bill totals as a Decimal, 0.00 rather than NULL when nothing matches"""
+    return Coalesce(Sum('total_amount', filter=condition), Value(Decimal('0.00')), output_field=REVENUE_FIELD)
+
+
+class DailyBillSequence(models.Model):
+    """Per-day counter used to number bills without scanning the Billing table"""
+    date = models.DateField(primary_key=True)
+    seq = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'billing_daily_seq'
+        verbose_name = "Daily Bill Sequence"
+
+    @classmethod
+    def next_value(cls, date, count=1):
+        """Atomically advance the counter for a date by `count` and return the new (last reserved) value"""
+        with transaction.atomic():
+            if not cls.objects.filter(date=date).update(seq=F('seq') + count):
+                try:
+                    # First bill of the day; a concurrent insert falls through to the update
+                    with transaction.atomic():
+                        cls.objects.create(date=date, seq=count)
+                    return count
+                except IntegrityError:
+                    cls.objects.filter(date=date).update(seq=F('seq') + count)
+            return cls.objects.filter(date=date).values_list('seq', flat=True).get()
+
+    def __str__(self):
+        return f"{self.date}: {self.seq}"
+
+
+class BillingManager(models.Manager):
+    """Default manager that eager-loads the relations every bill display touches"""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            'patient', 'prescription', 'created_by'
+        ).prefetch_related('lab_requests')
+
+    def plain(self):
+        """Queryset without the eager loading, for counts, aggregates and reads that never display the relations"""
+        return super().get_queryset()
+
 
 class Billing(models.Model):
     PAYMENT_STATUS_CHOICES = [
@@ -36,6 +113,7 @@ class Billing(models.Model):
         max_digits=10, 
         decimal_places=2, 
         default=300.00,
+        validators=[MinValueValidator(Decimal('0.00'), message='Consultation fee cannot be negative')],
         help_text="Consultation fee"
     )
     
@@ -43,6 +121,7 @@ class Billing(models.Model):
         max_digits=10, 
         decimal_places=2, 
         default=0.00,
+        validators=[MinValueValidator(Decimal('0.00'), message='Medicine cost cannot be negative')],
         help_text="Total medicine cost"
     )
     
@@ -50,6 +129,7 @@ class Billing(models.Model):
         max_digits=10, 
         decimal_places=2, 
         default=0.00,
+        validators=[MinValueValidator(Decimal('0.00'), message='Lab cost cannot be negative')],
         help_text="Total laboratory test costs"
     )
     
@@ -57,6 +137,7 @@ class Billing(models.Model):
         max_digits=10, 
         decimal_places=2, 
         default=0.00,
+        validators=[MinValueValidator(Decimal('0.00'), message='Other charges cannot be negative')],
         help_text="Other miscellaneous charges"
     )
     
@@ -64,6 +145,7 @@ class Billing(models.Model):
         max_digits=10, 
         decimal_places=2, 
         default=0.00,
+        validators=[MinValueValidator(Decimal('0.00'), message='Discount cannot be negative')],
         help_text="Discount amount"
     )
     
@@ -71,13 +153,21 @@ class Billing(models.Model):
         max_digits=10, 
         decimal_places=2, 
         default=0.00,
+        validators=[MinValueValidator(Decimal('0.00'), message='Tax amount cannot be negative')],
         help_text="Tax amount"
     )
     
-    total_amount = models.DecimalField(
-        max_digits=10, 
-        decimal_places=2, 
-        default=0.00,
+    subtotal = models.GeneratedField(
+        expression=SUBTOTAL_EXPRESSION,
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+        help_text="Charges before discount and tax"
+    )
+    
+    total_amount = models.GeneratedField(
+        expression=TOTAL_EXPRESSION,
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
         help_text="Final total amount after calculations"
     )
     
@@ -85,13 +175,14 @@ class Billing(models.Model):
         max_digits=10, 
         decimal_places=2, 
         default=0.00,
+        validators=[MinValueValidator(Decimal('0.00'), message='Amount paid cannot be negative')],
         help_text="Amount paid by patient"
     )
     
-    balance_due = models.DecimalField(
-        max_digits=10, 
-        decimal_places=2, 
-        default=0.00,
+    balance_due = models.GeneratedField(
+        expression=TOTAL_EXPRESSION - F('amount_paid'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
         help_text="Remaining balance to be paid"
     )
     
@@ -159,6 +250,8 @@ class Billing(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(default=timezone.now)
 
+    objects = BillingManager()
+
     class Meta:
         verbose_name = "Billing"
         verbose_name_plural = "Billing Records"
@@ -166,102 +259,134 @@ class Billing(models.Model):
         indexes = [
             models.Index(fields=['bill_number']),
             models.Index(fields=['patient', 'billing_date']),
-            models.Index(fields=['payment_status']),
+            # Overdue/pending scans and PAID revenue sums filter on status first.
+            # overdue_q() is an IN list on payment_status plus a due_date range, which
+            # MySQL serves as one range scan per status; it has no partial indexes, so
+            # the index covers every status rather than just the unpaid ones
+            models.Index(fields=['payment_status', 'due_date'], name='bill_overdue_idx'),
+            models.Index(fields=['payment_status', 'payment_date'], name='bill_paid_date_idx'),
         ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(**{f'{field}__gte': 0}),
+                name=f'billing_{field}_nonneg',
+                violation_error_message=message,
+            )
+            for field, message in NON_NEGATIVE_AMOUNTS
+        ] + [
+            models.CheckConstraint(
+                condition=Q(amount_paid__lte=F('total_amount')),
+                name='billing_paid_within_total',
+                violation_error_message=PAID_WITHIN_TOTAL_MESSAGE,
+            ),
+        ]
+
+    # Amount inputs as last read from or written to the database, so save() knows whether
+    # the generated totals it holds are stale
+    _loaded_amounts = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_amounts = instance.current_amounts()
+        return instance
+
+    def current_amounts(self):
+        return tuple(self.__dict__.get(field) for field in AMOUNT_INPUT_FIELDS)
 
     def __str__(self):
         return f"Bill #{self.bill_number} - {self.patient.name} - ₹{self.total_amount}"
 
-    def clean(self):
-        """Model-level validation"""
-        errors = {}
-        
-        # Validate amounts are non-negative
-        if self.consultation_fee < 0:
-            errors['consultation_fee'] = 'Consultation fee cannot be negative'
-        
-        if self.medicine_cost < 0:
-            errors['medicine_cost'] = 'Medicine cost cannot be negative'
-        
-        if self.lab_cost < 0:
-            errors['lab_cost'] = 'Lab cost cannot be negative'
-        
-        if self.other_charges < 0:
-            errors['other_charges'] = 'Other charges cannot be negative'
-        
-        if self.discount < 0:
-            errors['discount'] = 'Discount cannot be negative'
-        
-        if self.tax_amount < 0:
-            errors['tax_amount'] = 'Tax amount cannot be negative'
-        
-        # Validate amount paid doesn't exceed total amount
-        if self.amount_paid > self.total_amount:
-            errors['amount_paid'] = 'Amount paid cannot exceed total amount'
-        
-        if errors:
-            raise ValidationError(errors)
+    @staticmethod
+    def constraint_error_detail(error):
+        """Field errors for an IntegrityError raised by one of the amount CHECK constraints, else None"""
+        message = str(error)
+        for name, field_error in AMOUNT_CONSTRAINT_ERRORS.items():
+            if name in message:
+                return field_error
+        return None
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, skip_validation=False, **kwargs):
         """Override save to generate bill number and calculate totals"""
-        # Generate bill number if not set
-        if not self.bill_number:
-            self.bill_number = self.generate_bill_number()
-        
-        # Calculate totals before saving
-        self.calculate_total()
+        # The sequence advance is rolled back with the insert if validation fails
+        with transaction.atomic():
+            # Generate bill number if not set
+            if not self.bill_number:
+                self.bill_number = self.generate_bill_number()
+            
+            self.prepare_for_write()
+            
+            # Internal mutators validate their own inputs and skip the full pass;
+            # the amount CHECK constraints are enforced by the database on write
+            if not skip_validation:
+                self.full_clean(validate_constraints=False)
+            super().save(*args, **kwargs)
+            # MySQL cannot return generated columns from INSERT/UPDATE; re-read them only
+            # when an input they are computed from was written with a new value
+            amounts = self.current_amounts()
+            if amounts != self._loaded_amounts:
+                self.refresh_from_db(fields=GENERATED_AMOUNT_FIELDS)
+                self._loaded_amounts = amounts
+            self.clear_overdue_cache()
+
+    def prepare_for_write(self):
+        """Fill in the fields save() derives in Python before the row is written"""
+        # Totals are generated columns; only the status is decided here
+        self.update_payment_status()
         
         # Set due date if not set (default: 15 days from billing date)
         if not self.due_date:
             self.due_date = self.billing_date + timezone.timedelta(days=15)
-        
-        self.full_clean()
-        super().save(*args, **kwargs)
+
+    @classmethod
+    def bulk_create_bills(cls, bills, batch_size=500):
+        """Insert many bills with one sequence advance and batched INSERTs (imports); returns the stored rows"""
+        bills = list(bills)
+        unnumbered = [bill for bill in bills if not bill.bill_number]
+        with transaction.atomic():
+            if unnumbered:
+                today = timezone.now().date()
+                last = DailyBillSequence.next_value(today, count=len(unnumbered))
+                for sequence, bill in enumerate(unnumbered, start=last - len(unnumbered) + 1):
+                    bill.bill_number = cls.format_bill_number(today, sequence)
+            for bill in bills:
+                bill.prepare_for_write()
+            # Callers validate import rows up front
+            cls.objects.bulk_create(bills, batch_size=batch_size)
+            # MySQL neither returns the new ids nor the generated totals, so the batch is read
+            # back by its (unique, already assigned) bill numbers in the same transaction
+            stored = cls.objects.plain().in_bulk([bill.bill_number for bill in bills], field_name='bill_number')
+            return [stored[bill.bill_number] for bill in bills]
 
     def generate_bill_number(self):
         """Generate unique bill number in format BILL-YYYYMMDD-XXXX"""
         today = timezone.now().date()
-        date_str = today.strftime('%Y%m%d')
-        
-        # Count bills for today to get sequence number
-        today_bills_count = Billing.objects.filter(
-            created_at__date=today
-        ).count()
         
-        sequence = today_bills_count + 1
-        return f"BILL-{date_str}-{sequence:04d}"
+        # O(1) counter advance instead of counting today's bills
+        sequence = DailyBillSequence.next_value(today)
+        return self.format_bill_number(today, sequence)
+
+    @staticmethod
+    def format_bill_number(date, sequence):
+        return f"BILL-{date.strftime('%Y%m%d')}-{sequence:04d}"
 
-    def calculate_total(self):
-        """Calculate total amount, balance due, and update payment status"""
-        # Calculate subtotal
-        subtotal = (
+    def expected_total(self):
+        """Python mirror of the total_amount column for decisions made before the row is written"""
+        total = (
             self.consultation_fee + 
             self.medicine_cost + 
             self.lab_cost + 
-            self.other_charges
+            self.other_charges - 
+            self.discount + 
+            self.tax_amount
         )
-        
-        # Apply discount
-        discounted_amount = subtotal - self.discount
-        
-        # Calculate final total (subtotal - discount + tax)
-        self.total_amount = discounted_amount + self.tax_amount
-        
-        # Ensure total amount is not negative
-        if self.total_amount < 0:
-            self.total_amount = 0
-        
-        # Calculate balance due
-        self.balance_due = self.total_amount - self.amount_paid
-        
-        # Update payment status based on amounts
-        self.update_payment_status()
+        return max(total, 0)
 
     def update_payment_status(self):
         """Update payment status based on amount paid and balance due"""
         if self.amount_paid == 0:
             self.payment_status = 'PENDING'
-        elif self.amount_paid >= self.total_amount:
+        elif self.amount_paid >= self.expected_total():
             self.payment_status = 'PAID'
             self.payment_date = timezone.now()
         elif self.amount_paid > 0:
@@ -277,29 +402,44 @@ class Billing(models.Model):
         if amount > self.balance_due:
             raise ValidationError("Payment amount exceeds balance due")
         
-        self.amount_paid += amount
-        
+        amount = Decimal(str(amount))
+        now = timezone.now()
+        # One conditional UPDATE so concurrent payments add up instead of overwriting each other.
+        # MySQL applies SET assignments left to right, so the status columns are listed before
+        # amount_paid and their CASE tests still see the amount paid before this payment
+        covers_total = Q(total_amount__lte=F('amount_paid') + amount)
+        changes = {
+            'payment_status': Case(When(covers_total, then=Value('PAID')), default=Value('PARTIAL')),
+            'payment_date': Case(When(covers_total, then=Value(now)), default=F('payment_date')),
+            'amount_paid': F('amount_paid') + amount,
+        }
         if method:
-            self.payment_method = method
-        
+            changes['payment_method'] = method
         if notes:
-            self.notes = notes
+            changes['notes'] = notes
+        
+        # The balance is re-checked against the stored row, not this instance's copy
+        if not Billing.objects.filter(pk=self.pk, balance_due__gte=amount).update(**changes):
+            raise ValidationError("Payment amount exceeds balance due")
         
-        self.calculate_total()
-        self.save()
+        self.refresh_from_db(fields=PAYMENT_FIELDS + GENERATED_AMOUNT_FIELDS)
+        self.clear_overdue_cache()
 
     def mark_as_paid(self, method='CASH', notes=""):
         """Mark the bill as fully paid"""
-        self.amount_paid = self.total_amount
-        self.payment_method = method
-        self.payment_status = 'PAID'
-        self.payment_date = timezone.now()
-        
+        # Settle against the stored total in one UPDATE rather than a read-modify-write save()
+        changes = {
+            'amount_paid': TOTAL_EXPRESSION,
+            'payment_method': method,
+            'payment_status': 'PAID',
+            'payment_date': timezone.now(),
+        }
         if notes:
-            self.notes = notes
+            changes['notes'] = notes
         
-        self.calculate_total()
-        self.save()
+        Billing.objects.filter(pk=self.pk).update(**changes)
+        self.refresh_from_db(fields=PAYMENT_FIELDS + GENERATED_AMOUNT_FIELDS)
+        self.clear_overdue_cache()
 
     def apply_discount(self, discount_amount, reason=""):
         """Apply discount to the bill"""
@@ -309,38 +449,52 @@ class Billing(models.Model):
         if discount_amount > self.total_amount:
             raise ValidationError("Discount cannot exceed total amount")
         
-        self.discount = discount_amount
-        
+        discount_amount = Decimal(str(discount_amount))
+        new_total = Greatest(SUBTOTAL_EXPRESSION - Value(discount_amount) + F('tax_amount'), Value(Decimal('0.00')))
+        # Same status rules as update_payment_status(), evaluated against the stored payments
+        changes = {
+            'discount': discount_amount,
+            'payment_status': Case(
+                When(amount_paid=0, then=Value('PENDING')),
+                When(amount_paid__gte=new_total, then=Value('PAID')),
+                default=Value('PARTIAL'),
+            ),
+            'payment_date': Case(
+                When(Q(amount_paid__gt=0, amount_paid__gte=new_total), then=Value(timezone.now())),
+                default=F('payment_date'),
+            ),
+        }
         if reason:
-            current_notes = self.notes or ""
-            self.notes = f"{current_notes}\nDiscount applied: {reason}".strip()
+            line = f"Discount applied: {reason}"
+            changes['notes'] = Case(
+                When(notes='', then=Value(line)),
+                default=Concat(F('notes'), Value(f"\n{line}")),
+                output_field=models.TextField(),
+            )
+        
+        # A payment made meanwhile may no longer fit under the discounted total
+        if not Billing.objects.filter(pk=self.pk, amount_paid__lte=new_total).update(**changes):
+            raise ValidationError("Discount would reduce the total below the amount already paid")
         
-        self.calculate_total()
-        self.save()
+        self.refresh_from_db(fields=['discount'] + PAYMENT_FIELDS + GENERATED_AMOUNT_FIELDS)
+        self.clear_overdue_cache()
+
+    def clear_overdue_cache(self):
+        """Status or due date may have changed under the memoized overdue values"""
+        for name in OVERDUE_CACHED_PROPERTIES:
+            self.__dict__.pop(name, None)
 
-    @property
+    @cached_property
     def is_overdue(self):
         """Check if the bill is overdue"""
-        if self.payment_status == 'PAID':
-            return False
-        return self.due_date and timezone.now().date() > self.due_date
+        return self.days_overdue > 0
 
-    @property
+    @cached_property
     def days_overdue(self):
         """Calculate number of days overdue"""
-        if not self.is_overdue:
+        if self.payment_status == 'PAID' or not self.due_date:
             return 0
-        return (timezone.now().date() - self.due_date).days
-
-    @property
-    def subtotal(self):
-        """Calculate subtotal before discount and tax"""
-        return (
-            self.consultation_fee + 
-            self.medicine_cost + 
-            self.lab_cost + 
-            self.other_charges
-        )
+        return max((timezone.now().date() - self.due_date).days, 0)
 
     def get_bill_summary(self):
         """Get a summary of the bill"""
@@ -362,23 +516,54 @@ class Billing(models.Model):
         """Get all pending bills"""
         return cls.objects.filter(payment_status='PENDING')
 
+    @staticmethod
+    def overdue_q(today):
+        """Condition for unpaid bills past their due date"""
+        return Q(payment_status__in=['PENDING', 'PARTIAL'], due_date__lt=today)
+
+    @staticmethod
+    def paid_in_period_q(start_date=None, end_date=None):
+        """Condition for paid bills whose payment falls within the given dates (inclusive)"""
+        # Half-open datetime bounds keep the lookup on bill_paid_date_idx and include all of end_date
+        period = Q(payment_status='PAID')
+        if start_date:
+            period &= Q(payment_date__gte=start_date)
+        if end_date:
+            period &= Q(payment_date__lt=end_date + timezone.timedelta(days=1))
+        return period
+
     @classmethod
-    def get_overdue_bills(cls):
-        """Get all overdue bills"""
-        today = timezone.now().date()
-        return cls.objects.filter(
-            payment_status__in=['PENDING', 'PARTIAL'],
-            due_date__lt=today
-        )
+    def get_overdue_bills(cls, queryset=None):
+        """Get all overdue bills, optionally narrowing an existing (already eager-loaded) queryset"""
+        return (cls.objects.all() if queryset is None else queryset).filter(cls.overdue_q(timezone.now().date()))
 
     @classmethod
     def get_total_revenue(cls, start_date=None, end_date=None):
         """Calculate total revenue for a period"""
-        queryset = cls.objects.filter(payment_status='PAID')
-        
-        if start_date:
-            queryset = queryset.filter(payment_date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(payment_date__lte=end_date)
-        
-        return queryset.aggregate(total_revenue=models.Sum('total_amount'))['total_revenue'] or 0
\ No newline at end of file
+        return cls.objects.plain().filter(cls.paid_in_period_q(start_date, end_date)).aggregate(
+            total_revenue=revenue_sum()
+        )['total_revenue']
+
+    @classmethod
+    def get_daily_revenue(cls, start_date=None, end_date=None):
+        """Revenue per payment day for a period, in one grouped query"""
+        return (
+            cls.objects.plain().filter(cls.paid_in_period_q(start_date, end_date))
+            .annotate(day=TruncDate('payment_date'))
+            .values('day')
+            .annotate(revenue=revenue_sum())
+            .order_by('day')
+        )
+
+    @classmethod
+    def get_stats(cls):
+        """Dashboard counts and revenue figures, computed in a single aggregate query"""
+        today = timezone.now().date()
+        return cls.objects.plain().aggregate(
+            total_revenue=revenue_sum(cls.paid_in_period_q()),
+            today_revenue=revenue_sum(cls.paid_in_period_q(today, today)),
+            month_revenue=revenue_sum(cls.paid_in_period_q(today.replace(day=1))),
+            pending_bills=Count('pk', filter=Q(payment_status='PENDING')),
+            overdue_bills=Count('pk', filter=cls.overdue_q(today)),
+            paid_bills=Count('pk', filter=Q(payment_status='PAID')),
+        )
\ No newline at end of file
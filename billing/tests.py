@@ -1,3 +1,212 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.test import APIClient
+from django.test.utils import CaptureQueriesContext
+
+from adminapp.models import Staff
+from receptionist.models import Patient
+from .models import Billing, PAID_WITHIN_TOTAL_MESSAGE
+from .serializers import BillingSerializer
+
+
+def make_staff(role, email):
+    staff = Staff(full_name=f'Test {role.title()}', email=email, role=role)
+    staff.set_password('Passw0rdX')
+    staff.save()
+    return staff
+
+
+class BillingTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.receptionist = make_staff('RECEPTIONIST', 'reception@hospital.com')
+        cls.patient = Patient.objects.create(
+            name='John Doe', age=30, gender='MALE', address='123 Long Street Address',
+            phone='9876543210', created_by=cls.receptionist,
+        )
+
+    def make_bill(self, **amounts):
+        amounts.setdefault('consultation_fee', Decimal('300.00'))
+        return Billing.objects.create(patient=self.patient, created_by=self.receptionist, **amounts)
+
+
+class PaymentTests(BillingTestCase):
+    def test_partial_payment_stays_partial(self):
+        bill = self.make_bill()
+        bill.add_payment(150)
+        self.assertEqual(bill.payment_status, 'PARTIAL')
+        self.assertIsNone(bill.payment_date)
+        self.assertEqual(bill.amount_paid, Decimal('150.00'))
+        self.assertEqual(bill.balance_due, Decimal('150.00'))
+
+    def test_payment_status_is_assigned_before_amount_paid(self):
+        # MySQL evaluates SET left to right; the CASE must see the amount paid before this payment
+        bill = self.make_bill()
+        with CaptureQueriesContext(connection) as queries:
+            bill.add_payment(150)
+        update = next(q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE'))
+        set_clause = update.split(' WHERE ')[0]
+        quote = connection.ops.quote_name
+        self.assertLess(set_clause.index(quote('payment_status')), set_clause.index(f"{quote('amount_paid')} ="))
+
+    def test_payment_covering_balance_marks_paid(self):
+        bill = self.make_bill()
+        bill.add_payment(100)
+        bill.add_payment(200)
+        self.assertEqual(bill.payment_status, 'PAID')
+        self.assertIsNotNone(bill.payment_date)
+        self.assertEqual(bill.balance_due, Decimal('0.00'))
+
+    def test_payment_over_balance_is_rejected(self):
+        bill = self.make_bill()
+        with self.assertRaisesMessage(ValidationError, 'Payment amount exceeds balance due'):
+            bill.add_payment(301)
+        bill.refresh_from_db()
+        self.assertEqual(bill.amount_paid, Decimal('0.00'))
+        self.assertEqual(bill.payment_status, 'PENDING')
+
+    def test_payment_checks_stored_balance(self):
+        # Another request paid part of the bill after this instance was loaded
+        bill = self.make_bill()
+        Billing.objects.get(pk=bill.pk).add_payment(200)
+        with self.assertRaisesMessage(ValidationError, 'Payment amount exceeds balance due'):
+            bill.add_payment(150)
+        bill.refresh_from_db()
+        self.assertEqual(bill.amount_paid, Decimal('200.00'))
+
+    def test_non_positive_payment_is_rejected(self):
+        bill = self.make_bill()
+        with self.assertRaisesMessage(ValidationError, 'Payment amount must be positive'):
+            bill.add_payment(0)
+
+    def test_mark_as_paid_settles_stored_total(self):
+        bill = self.make_bill(lab_cost=Decimal('150.00'))
+        bill.add_payment(100)
+        bill.mark_as_paid('CARD', 'Settled at discharge')
+        self.assertEqual(bill.amount_paid, Decimal('450.00'))
+        self.assertEqual(bill.balance_due, Decimal('0.00'))
+        self.assertEqual(bill.payment_status, 'PAID')
+        self.assertEqual(bill.payment_method, 'CARD')
+        self.assertEqual(bill.notes, 'Settled at discharge')
+        self.assertIsNotNone(bill.payment_date)
+        self.assertFalse(bill.is_overdue)
+
+
+
+class GeneratedAmountTests(BillingTestCase):
+    def test_save_rereads_totals_after_amount_change(self):
+        bill = self.make_bill()
+        self.assertEqual(bill.total_amount, Decimal('300.00'))
+        bill.lab_cost = Decimal('150.00')
+        bill.save()
+        self.assertEqual(bill.subtotal, Decimal('450.00'))
+        self.assertEqual(bill.total_amount, Decimal('450.00'))
+        self.assertEqual(bill.balance_due, Decimal('450.00'))
+
+    def test_save_without_amount_change_skips_reread(self):
+        bill = Billing.objects.plain().get(pk=self.make_bill().pk)
+        bill.notes = 'Called the patient about payment'
+        with CaptureQueriesContext(connection) as queries:
+            bill.save()
+        self.assertFalse([q for q in queries.captured_queries if q['sql'].startswith('SELECT') and 'total_amount' in q['sql']])
+        self.assertEqual(bill.total_amount, Decimal('300.00'))
+
+    def test_serializer_renders_totals_as_decimal_strings(self):
+        data = BillingSerializer(self.make_bill(discount=Decimal('50.00'))).data
+        self.assertEqual((data['subtotal'], data['total_amount'], data['balance_due']), ('300.00', '250.00', '250.00'))
+
+class BulkCreateBillsTests(BillingTestCase):
+    def test_returns_stored_rows_with_ids_and_totals(self):
+        bills = [
+            Billing(patient=self.patient, created_by=self.receptionist, consultation_fee=Decimal('300.00'), lab_cost=lab_cost)
+            for lab_cost in (Decimal('0.00'), Decimal('150.00'))
+        ]
+        # MySQL returns neither the new ids nor the generated totals from a bulk insert
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            created = Billing.bulk_create_bills(bills)
+        self.assertEqual([bill.pk for bill in created], list(Billing.objects.order_by('pk').values_list('pk', flat=True)))
+        self.assertEqual([bill.total_amount for bill in created], [Decimal('300.00'), Decimal('450.00')])
+        self.assertEqual([bill.balance_due for bill in created], [Decimal('300.00'), Decimal('450.00')])
+
+class ConstraintErrorTests(BillingTestCase):
+    def test_constraint_error_detail_maps_known_constraints(self):
+        error = IntegrityError('CHECK constraint failed: billing_paid_within_total')
+        self.assertEqual(Billing.constraint_error_detail(error), {'amount_paid': PAID_WITHIN_TOTAL_MESSAGE})
+        error = IntegrityError('Check constraint \'billing_discount_nonneg\' is violated.')
+        self.assertEqual(Billing.constraint_error_detail(error), {'discount': 'Discount cannot be negative'})
+
+    def test_constraint_error_detail_ignores_other_errors(self):
+        self.assertIsNone(Billing.constraint_error_detail(IntegrityError('UNIQUE constraint failed: billing.bill_number')))
+
+    def test_serializer_reports_constraint_violation_as_field_error(self):
+        # A discount that drops the total below what was already paid fails the paid-within-total CHECK
+        bill = self.make_bill()
+        bill.add_payment(200)
+        serializer = BillingSerializer(bill, data={'discount': '250.00'}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertRaises(serializers.ValidationError) as raised:
+            serializer.save()
+        self.assertEqual(raised.exception.detail, {'amount_paid': PAID_WITHIN_TOTAL_MESSAGE})
+        bill.refresh_from_db()
+        self.assertEqual(bill.discount, Decimal('0.00'))
+
+
+class BillingApiTests(BillingTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('cashier', 'cashier@hospital.com', 'Passw0rdX'))
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        for _ in range(3):
+            self.make_bill()
+        # Page count, the bills with their joined rows, and the prefetched lab requests
+        with self.assertNumQueries(3):
+            response = self.client.get('/billing/billing/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+
+    def test_overdue_query_count_does_not_grow_with_rows(self):
+        for _ in range(3):
+            self.make_bill()
+        self.make_bill().mark_as_paid()
+        Billing.objects.update(due_date=timezone.now().date() - timezone.timedelta(days=1))
+        with self.assertNumQueries(3):
+            response = self.client.get('/billing/billing/overdue/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertTrue(all(row['payment_status'] == 'PENDING' for row in response.data['results']))
+
+    def test_revenue_rejects_invalid_dates(self):
+        response = self.client.get('/billing/billing/revenue/', {'start_date': '2024-02-30', 'end_date': 'last week'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(response.data), ['end_date', 'start_date'])
+
+    def test_revenue_groups_paid_bills_by_day(self):
+        self.make_bill().mark_as_paid()
+        today = timezone.now().date().isoformat()
+        response = self.client.get('/billing/billing/revenue/', {'start_date': today, 'end_date': today})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['revenue'] for row in response.data], [Decimal('300.00')])
+
 
-# Create your tests here.
+class BillingAdminTests(BillingTestCase):
+    def test_overpayment_is_a_form_error(self):
+        self.client.force_login(User.objects.create_superuser('root', 'root@hospital.com', 'Passw0rdX'))
+        response = self.client.post(reverse('admin:billing_billing_add'), {
+            'patient': self.patient.pk, 'created_by': self.receptionist.pk,
+            'consultation_fee': '300', 'medicine_cost': '0', 'lab_cost': '0', 'other_charges': '0',
+            'discount': '0', 'tax_amount': '0', 'amount_paid': '500',
+            'payment_status': 'PENDING', 'payment_method': 'CASH',
+            'billing_date': '2026-10-15', 'due_date': '2026-10-30', 'notes': '',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['adminform'].form.errors['amount_paid'], [PAID_WITHIN_TOTAL_MESSAGE])
+        self.assertFalse(Billing.objects.exists())
@@ -2,6 +2,7 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.db.models import Sum, Q
 from .models import Billing
 from .serializers import BillingSerializer
@@ -12,16 +13,18 @@ class BillingViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        queryset = Billing.objects.all()
+        # The default manager already joins patient/prescription/created_by and prefetches lab_requests
         patient_id = self.request.query_params.get('patient_id')
         payment_status = self.request.query_params.get('payment_status')
         is_overdue = self.request.query_params.get('is_overdue')
         
-        if patient_id: queryset = queryset.filter(patient_id=patient_id)
-        if payment_status: queryset = queryset.filter(payment_status=payment_status)
-        if is_overdue == 'true': queryset = queryset.filter(due_date__lt=timezone.now().date(), payment_status__in=['PENDING', 'PARTIAL'])
+        # Conditions are combined first so the queryset is cloned by a single filter() call
+        conditions = Q()
+        if patient_id: conditions &= Q(patient_id=patient_id)
+        if payment_status: conditions &= Q(payment_status=payment_status)
+        if is_overdue == 'true': conditions &= Billing.overdue_q(timezone.now().date())
         
-        return queryset
+        return Billing.objects.filter(conditions)
     
     @action(detail=True, methods=['post'])
     def add_payment(self, request, pk=None):
@@ -59,20 +62,40 @@ class BillingViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        total_revenue = Billing.get_total_revenue()
-        pending_bills = Billing.get_pending_bills().count()
-        overdue_bills = Billing.get_overdue_bills().count()
-        today_revenue = Billing.get_total_revenue(timezone.now().date(), timezone.now().date())
+        stats = Billing.get_stats()
         
         return Response({
-            'total_revenue': total_revenue,
-            'pending_bills': pending_bills,
-            'overdue_bills': overdue_bills,
-            'today_revenue': today_revenue
+            'total_revenue': stats['total_revenue'],
+            'pending_bills': stats['pending_bills'],
+            'overdue_bills': stats['overdue_bills'],
+            'today_revenue': stats['today_revenue']
         })
     
+    @action(detail=False, methods=['get'])
+    def revenue(self, request):
+        dates, errors = {}, {}
+        for name in ('start_date', 'end_date'):
+            value = request.query_params.get(name)
+            if not value:
+                dates[name] = None
+                continue
+            # parse_date returns None for a malformed date and raises for an impossible one (2024-02-30)
+            try:
+                dates[name] = parse_date(value)
+            except ValueError:
+                dates[name] = None
+            if dates[name] is None:
+                errors[name] = 'Enter a valid date in YYYY-MM-DD format'
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(list(Billing.get_daily_revenue(dates['start_date'], dates['end_date'])))
+    
     @action(detail=False, methods=['get'])
     def overdue(self, request):
-        overdue_bills = Billing.get_overdue_bills()
+        # Narrow the viewset queryset so the list keeps its eager loading and filters
+        overdue_bills = Billing.get_overdue_bills(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(overdue_bills)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
         serializer = self.get_serializer(overdue_bills, many=True)
         return Response(serializer.data)
\ No newline at end of file
@@ -1,7 +1,19 @@
 from django.contrib import admin
 from django import forms
+from django.contrib.admin.views.main import ChangeList
 from .models import Diagnosis, Prescription, LabRequest
 
+class DeferredTextChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).defer(*self.model_admin.list_defer)
+
+class DeferListTextMixin:
+    """Leave wide text columns out of changelist queries; the change form still loads full rows"""
+    list_defer = ()
+    
+    def get_changelist(self, request, **kwargs):
+        return DeferredTextChangeList
+
 class DiagnosisAdminForm(forms.ModelForm):
     class Meta:
         model = Diagnosis
@@ -20,9 +32,10 @@ class DiagnosisAdminForm(forms.ModelForm):
         return diagnosis
 
 @admin.register(Diagnosis)
-class DiagnosisAdmin(admin.ModelAdmin):
+class DiagnosisAdmin(DeferListTextMixin, admin.ModelAdmin):
     form = DiagnosisAdminForm
     list_display = ['appointment', 'doctor', 'severity', 'follow_up_required', 'created_at']
+    list_defer = ['symptoms', 'diagnosis', 'notes']
     list_filter = ['severity', 'follow_up_required', 'is_chronic', 'created_at']
     search_fields = ['appointment__patient__full_name', 'symptoms', 'diagnosis']
     readonly_fields = ['created_at', 'updated_at']
@@ -51,9 +64,10 @@ class PrescriptionAdminForm(forms.ModelForm):
         return duration
 
 @admin.register(Prescription)
-class PrescriptionAdmin(admin.ModelAdmin):
+class PrescriptionAdmin(DeferListTextMixin, admin.ModelAdmin):
     form = PrescriptionAdminForm
     list_display = ['medicine_name', 'appointment', 'doctor', 'dosage', 'frequency', 'is_active']
+    list_defer = ['instructions']
     list_filter = ['frequency', 'is_active', 'is_controlled', 'created_at']
     search_fields = ['medicine_name', 'appointment__patient__full_name']
     readonly_fields = ['created_at']
@@ -82,9 +96,10 @@ class LabRequestAdminForm(forms.ModelForm):
         return duration
 
 @admin.register(LabRequest)
-class LabRequestAdmin(admin.ModelAdmin):
+class LabRequestAdmin(DeferListTextMixin, admin.ModelAdmin):
     form = LabRequestAdminForm
     list_display = ['test_name', 'appointment', 'doctor', 'test_type', 'status', 'priority', 'requested_date']
+    list_defer = ['test_description', 'special_instructions']
     list_filter = ['test_type', 'status', 'priority', 'is_fasting_required', 'requested_date']
     search_fields = ['test_name', 'appointment__patient__full_name']
     readonly_fields = ['requested_date', 'completed_date']
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:36
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapp', '0004_staff_name_idx'),
+        ('doctor', '0001_initial'),
+        ('receptionist', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='prescription',
+            constraint=models.UniqueConstraint(models.F('appointment'), django.db.models.functions.text.Lower('medicine_name'), name='uniq_appt_medicine_ci'),
+        ),
+    ]
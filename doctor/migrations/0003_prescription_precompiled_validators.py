@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:45
+
+import django.core.validators
+import re
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctor', '0002_prescription_unique_medicine'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='prescription',
+            name='dosage',
+            field=models.CharField(help_text='Enter dosage (e.g., 500mg, 10ml, 1 tablet)', max_length=100, validators=[django.core.validators.RegexValidator(message='Dosage format: 500mg, 10ml, 1 tablet, etc.', regex=re.compile('^[a-zA-Z0-9\\s\\-\\.\\/]{1,50}$'))]),
+        ),
+        migrations.AlterField(
+            model_name='prescription',
+            name='medicine_name',
+            field=models.CharField(help_text='Enter medicine name', max_length=100, validators=[django.core.validators.RegexValidator(message='Medicine name can only contain letters, numbers, spaces, hyphens, dots and parentheses', regex=re.compile('^[a-zA-Z0-9\\s\\-\\.\\(\\)]{2,100}$'))]),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:54
+
+import django.core.validators
+import django.db.models.functions.text
+import django.db.models.lookups
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapp', '0004_staff_name_idx'),
+        ('doctor', '0003_prescription_precompiled_validators'),
+        ('receptionist', '0002_appointment_doctor_name_cached'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='diagnosis',
+            name='diagnosis',
+            field=models.TextField(help_text='Enter medical diagnosis', validators=[django.core.validators.MinLengthValidator(5, message='Diagnosis must be at least 5 characters'), django.core.validators.MaxLengthValidator(5000, message='Diagnosis too long (max 5000 characters)')]),
+        ),
+        migrations.AlterField(
+            model_name='diagnosis',
+            name='symptoms',
+            field=models.TextField(help_text='Describe patient symptoms in detail', validators=[django.core.validators.MinLengthValidator(10, message='Symptoms description must be at least 10 characters'), django.core.validators.MaxLengthValidator(10000, message='Symptoms description too long (max 10000 characters)')]),
+        ),
+        migrations.AlterField(
+            model_name='labrequest',
+            name='test_name',
+            field=models.CharField(help_text='Name of the test', max_length=100, validators=[django.core.validators.MinLengthValidator(2, message='Test name must be at least 2 characters')]),
+        ),
+        migrations.AddConstraint(
+            model_name='diagnosis',
+            constraint=models.CheckConstraint(condition=django.db.models.lookups.GreaterThanOrEqual(django.db.models.functions.text.Length('symptoms'), 10), name='diagnosis_symptoms_min_length'),
+        ),
+        migrations.AddConstraint(
+            model_name='diagnosis',
+            constraint=models.CheckConstraint(condition=django.db.models.lookups.GreaterThanOrEqual(django.db.models.functions.text.Length('diagnosis'), 5), name='diagnosis_diagnosis_min_length'),
+        ),
+    ]
@@ -1,7 +1,19 @@
-from django.db import models
-from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator, MinLengthValidator
+import re
+
+from django.db import models, transaction, IntegrityError
+from django.db.models.functions import Length, Lower
+from django.db.models.lookups import GreaterThanOrEqual
+from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator, MinLengthValidator, MaxLengthValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from CMS.db import is_duplicate_key
+
+# Substring keyword scans done in one regex pass (same matching as the old `in` checks)
+CONTROLLED_MEDICINE_RE = re.compile(r'morphine|oxycodone|fentanyl|amphetamine', re.IGNORECASE)
+FASTING_TEST_RE = re.compile(r'blood glucose|lipid profile|cholesterol|fasting', re.IGNORECASE)
+# Compiled at import and handed to the Prescription field validators, which would otherwise compile lazily
+MEDICINE_NAME_RE = re.compile(r'^[a-zA-Z0-9\s\-\.\(\)]{2,100}$')
+DOSAGE_RE = re.compile(r'^[a-zA-Z0-9\s\-\.\/]{1,50}$')
 
 class Diagnosis(models.Model):
     SEVERITY_CHOICES = [
@@ -25,12 +37,18 @@ class Diagnosis(models.Model):
     )
     
     symptoms = models.TextField(
-        validators=[MinLengthValidator(10, message='Symptoms description must be at least 10 characters')],
+        validators=[
+            MinLengthValidator(10, message='Symptoms description must be at least 10 characters'),
+            MaxLengthValidator(10000, message='Symptoms description too long (max 10000 characters)'),
+        ],
         help_text="Describe patient symptoms in detail"
     )
     
     diagnosis = models.TextField(
-        validators=[MinLengthValidator(5, message='Diagnosis must be at least 5 characters')],
+        validators=[
+            MinLengthValidator(5, message='Diagnosis must be at least 5 characters'),
+            MaxLengthValidator(5000, message='Diagnosis too long (max 5000 characters)'),
+        ],
         help_text="Enter medical diagnosis"
     )
     
@@ -76,6 +94,17 @@ class Diagnosis(models.Model):
             models.Index(fields=['doctor']),
             models.Index(fields=['severity']),
         ]
+        # The minimum lengths again, for rows written without save()
+        constraints = [
+            models.CheckConstraint(
+                condition=GreaterThanOrEqual(Length('symptoms'), 10),
+                name='diagnosis_symptoms_min_length',
+            ),
+            models.CheckConstraint(
+                condition=GreaterThanOrEqual(Length('diagnosis'), 5),
+                name='diagnosis_diagnosis_min_length',
+            ),
+        ]
 
     def clean(self):
         """Diagnosis validation"""
@@ -88,8 +117,8 @@ class Diagnosis(models.Model):
             elif self.appointment.status != 'COMPLETED':
                 errors['appointment'] = 'Can only create diagnosis for completed appointments'
             
-            # Validate doctor is the same as appointment doctor (if appointment has doctor field)
-            if hasattr(self.appointment, 'doctor') and self.doctor and self.doctor != self.appointment.doctor:
+            # Validate doctor is the same as appointment doctor; comparing ids avoids loading either Staff row
+            if self.doctor_id and self.doctor_id != self.appointment.doctor_id:
                 errors['doctor'] = 'Diagnosis doctor must be the same as appointment doctor'
         
         # Validate symptoms length and content
@@ -110,30 +139,30 @@ class Diagnosis(models.Model):
             if self.follow_up_date <= self.appointment.appointment_date:
                 errors['follow_up_date'] = 'Follow-up date must be after the appointment date'
         
-        # Check for duplicate diagnosis for same appointment (only for new instances)
-        if not self.pk and self.appointment:
-            if Diagnosis.objects.filter(appointment=self.appointment).exists():
-                errors['appointment'] = 'Diagnosis already exists for this appointment'
-        
         if errors:
             raise ValidationError(errors)
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+    def save(self, *args, skip_validation=False, **kwargs):
+        # Internal status/flag updates skip the full pass; one diagnosis per appointment
+        # is left to the OneToOne unique index rather than a SELECT beforehand; the field
+        # validators already cover the length CHECK constraints
+        if not skip_validation:
+            self.full_clean(validate_unique=False, validate_constraints=False)
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError as e:
+            if is_duplicate_key(e, 'appointment_id'):
+                raise ValidationError({'appointment': 'Diagnosis already exists for this appointment'})
+            raise
 
     def get_patient_info(self):
         """Get formatted patient information"""
-        if self.appointment and hasattr(self.appointment, 'patient'):
+        # Appointment.patient is a required relation, so only the appointment itself can be missing
+        if self.appointment_id is not None:
             patient = self.appointment.patient
-            # Use full_name instead of name, and calculate age
-            age = "Unknown"
-            if hasattr(patient, 'date_of_birth') and patient.date_of_birth:
-                today = timezone.now().date()
-                age = today.year - patient.date_of_birth.year - (
-                    (today.month, today.day) < (patient.date_of_birth.month, patient.date_of_birth.day)
-                )
-            return f"{patient.full_name} ({age} years)"
+            # Age is stored on the patient, so no per-row date arithmetic is needed
+            return f"{patient.name} ({patient.age} years)"
         return "Unknown Patient"
 
     def get_condition_summary(self):
@@ -148,8 +177,8 @@ class Diagnosis(models.Model):
 
     def __str__(self):
         patient_name = "Unknown"
-        if self.appointment and hasattr(self.appointment, 'patient'):
-            patient_name = self.appointment.patient.full_name
+        if self.appointment_id is not None:
+            patient_name = self.appointment.patient.name
         diagnosis_preview = self.diagnosis[:30] + "..." if self.diagnosis else "No diagnosis"
         return f"Diagnosis for {patient_name} - {diagnosis_preview}"
 
@@ -163,22 +192,24 @@ class Prescription(models.Model):
         ('PRN', 'As Required'),
         ('STAT', 'Immediately'),
     ]
+    FREQUENCY_LABELS = dict(FREQUENCY_CHOICES)
 
     DURATION_UNIT_CHOICES = [
         ('DAYS', 'Days'),
         ('WEEKS', 'Weeks'),
         ('MONTHS', 'Months'),
     ]
+    DURATION_UNIT_LABELS = dict(DURATION_UNIT_CHOICES)
 
     # Medicine name validation
     medicine_validator = RegexValidator(
-        regex=r'^[a-zA-Z0-9\s\-\.\(\)]{2,100}$',
+        regex=MEDICINE_NAME_RE,
         message='Medicine name can only contain letters, numbers, spaces, hyphens, dots and parentheses'
     )
     
     # Dosage validation
     dosage_validator = RegexValidator(
-        regex=r'^[a-zA-Z0-9\s\-\.\/]{1,50}$',
+        regex=DOSAGE_RE,
         message='Dosage format: 500mg, 10ml, 1 tablet, etc.'
     )
 
@@ -265,6 +296,10 @@ class Prescription(models.Model):
             models.Index(fields=['doctor']),
             models.Index(fields=['medicine_name']),
         ]
+        constraints = [
+            # Duplicate check done by the database instead of an iexact query on every save
+            models.UniqueConstraint('appointment', Lower('medicine_name'), name='uniq_appt_medicine_ci'),
+        ]
 
     def clean(self):
         """Prescription validation"""
@@ -272,57 +307,40 @@ class Prescription(models.Model):
         
         # Validate appointment exists
         if self.appointment:
-            # Check if appointment has diagnosis (relaxed validation)
-            if not hasattr(self.appointment, 'diagnosis'):
-                # Just a warning, not an error - allow prescriptions without diagnosis
-                pass
-            
-            # Validate doctor is same as appointment doctor (if appointment has doctor field)
-            if hasattr(self.appointment, 'doctor') and self.doctor and self.doctor != self.appointment.doctor:
+            # Validate doctor is same as appointment doctor; comparing ids avoids loading either Staff row
+            if self.doctor_id and self.doctor_id != self.appointment.doctor_id:
                 errors['doctor'] = 'Prescribing doctor must be the same as appointment doctor'
         
-        # Validate medicine name
-        if self.medicine_name:
-            medicine_lower = self.medicine_name.lower()
-            
-            # Auto-detect controlled substances
-            restricted_medicines = ['morphine', 'oxycodone', 'fentanyl', 'amphetamine']
-            if any(med in medicine_lower for med in restricted_medicines):
-                self.is_controlled = True
-            
-            # Validate duration for antibiotics (suggestion, not error)
-            if 'antibiotic' in medicine_lower and self.duration < 5 and self.duration_unit == 'DAYS':
-                # Make this a warning, not an error
-                pass
+        # Auto-detect controlled substances
+        if self.medicine_name and CONTROLLED_MEDICINE_RE.search(self.medicine_name):
+            self.is_controlled = True
         
         # Validate frequency and duration combination
         if self.frequency == 'STAT' and self.duration > 1:
             errors['duration'] = 'STAT medications are for single use only'
         
-        # Check for duplicate prescriptions for same appointment
-        if self.appointment and self.medicine_name:
-            duplicate_prescriptions = Prescription.objects.filter(
-                appointment=self.appointment,
-                medicine_name__iexact=self.medicine_name
-            ).exclude(pk=self.pk)
-            
-            if duplicate_prescriptions.exists():
-                errors['medicine_name'] = f'{self.medicine_name} is already prescribed for this appointment'
-        
         if errors:
             raise ValidationError(errors)
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+    def save(self, *args, skip_validation=False, **kwargs):
+        # Internal status/flag updates skip the full pass and its duplicate-check queries
+        if not skip_validation:
+            self.full_clean(validate_constraints=False)
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError as e:
+            if 'uniq_appt_medicine_ci' in str(e):
+                raise ValidationError({'medicine_name': f'{self.medicine_name} is already prescribed for this appointment'})
+            raise
 
     def get_duration_display(self):
         """Get formatted duration"""
-        return f"{self.duration} {self.get_duration_unit_display().lower()}"
+        return f"{self.duration} {self.DURATION_UNIT_LABELS.get(self.duration_unit, self.duration_unit).lower()}"
 
     def get_frequency_display_full(self):
         """Get full frequency display"""
-        return dict(self.FREQUENCY_CHOICES).get(self.frequency, self.frequency)
+        return self.FREQUENCY_LABELS.get(self.frequency, self.frequency)
 
     def is_long_term(self):
         """Check if this is a long-term prescription"""
@@ -333,6 +351,12 @@ class Prescription(models.Model):
         return f"{self.medicine_name} - {self.dosage} ({self.get_frequency_display_full()})"
 
 
+class LabRequestQuerySet(models.QuerySet):
+    def cancellable(self):
+        """Requests still open to cancellation, as a filter usable with update()"""
+        return self.filter(status__in=LabRequest.CANCELLABLE_STATUSES)
+
+
 class LabRequest(models.Model):
     TEST_TYPE_CHOICES = [
         ('BLOOD_TEST', 'Blood Test'),
@@ -350,6 +374,7 @@ class LabRequest(models.Model):
         ('CANCELLED', 'Cancelled'),
         ('FAILED', 'Failed'),
     ]
+    CANCELLABLE_STATUSES = ('REQUESTED', 'IN_PROGRESS')
 
     PRIORITY_CHOICES = [
         ('ROUTINE', 'Routine'),
@@ -373,6 +398,7 @@ class LabRequest(models.Model):
     
     test_name = models.CharField(
         max_length=100,
+        validators=[MinLengthValidator(2, message='Test name must be at least 2 characters')],
         help_text="Name of the test"
     )
     
@@ -443,19 +469,25 @@ class LabRequest(models.Model):
             models.Index(fields=['priority']),
         ]
 
+    objects = LabRequestQuerySet.as_manager()
+
+    # Status as last read from or written to the database, for transition checks without a re-read
+    _loaded_status = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
     def clean(self):
         """Lab request validation"""
         errors = {}
         
         # Validate appointment exists
         if self.appointment:
-            # Check if appointment has diagnosis (relaxed validation)
-            if not hasattr(self.appointment, 'diagnosis'):
-                # Just a warning, not an error - allow lab requests without diagnosis
-                pass
-            
-            # Validate doctor is same as appointment doctor (if appointment has doctor field)
-            if hasattr(self.appointment, 'doctor') and self.doctor and self.doctor != self.appointment.doctor:
+            # Validate doctor is same as appointment doctor; comparing ids avoids loading either Staff row
+            if self.doctor_id and self.doctor_id != self.appointment.doctor_id:
                 errors['doctor'] = 'Requesting doctor must be the same as appointment doctor'
         
         # Validate test name
@@ -464,14 +496,14 @@ class LabRequest(models.Model):
         
         # Validate status transitions (only for existing instances)
         if self.pk:
-            try:
-                original = LabRequest.objects.get(pk=self.pk)
-                if original.status == 'COMPLETED' and self.status != 'COMPLETED':
-                    errors['status'] = 'Cannot change status from completed'
-                if original.status == 'CANCELLED' and self.status != 'CANCELLED':
-                    errors['status'] = 'Cannot change status from cancelled'
-            except LabRequest.DoesNotExist:
-                pass
+            original_status = self._loaded_status
+            if original_status is None:
+                # Built by hand or loaded with status deferred; fall back to reading the row
+                original_status = LabRequest.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+            if original_status == 'COMPLETED' and self.status != 'COMPLETED':
+                errors['status'] = 'Cannot change status from completed'
+            if original_status == 'CANCELLED' and self.status != 'CANCELLED':
+                errors['status'] = 'Cannot change status from cancelled'
         
         # Validate completed date
         if self.status == 'COMPLETED' and not self.completed_date:
@@ -481,28 +513,26 @@ class LabRequest(models.Model):
         
         # Auto-detect fasting requirement for specific tests
         if self.test_name:
-            fasting_tests = ['blood glucose', 'lipid profile', 'cholesterol', 'fasting']
-            if any(test in self.test_name.lower() for test in fasting_tests):
+            if FASTING_TEST_RE.search(self.test_name):
                 self.is_fasting_required = True
         
         if errors:
             raise ValidationError(errors)
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
+    def save(self, *args, skip_validation=False, **kwargs):
+        # Internal status/flag updates skip the full pass and its duplicate-check queries
+        if not skip_validation:
+            self.full_clean()
         super().save(*args, **kwargs)
+        self._loaded_status = self.status
 
     def get_patient_info(self):
         """Get formatted patient information"""
-        if self.appointment and hasattr(self.appointment, 'patient'):
+        # Appointment.patient is a required relation, so only the appointment itself can be missing
+        if self.appointment_id is not None:
             patient = self.appointment.patient
-            age = "Unknown"
-            if hasattr(patient, 'date_of_birth') and patient.date_of_birth:
-                today = timezone.now().date()
-                age = today.year - patient.date_of_birth.year - (
-                    (today.month, today.day) < (patient.date_of_birth.month, patient.date_of_birth.day)
-                )
-            return f"{patient.full_name} ({age} years)"
+            # Age is stored on the patient, so no per-row date arithmetic is needed
+            return f"{patient.name} ({patient.age} years)"
         return "Unknown Patient"
 
     def get_test_info(self):
@@ -521,17 +551,28 @@ class LabRequest(models.Model):
 
     def can_be_cancelled(self):
         """Check if test can be cancelled"""
-        return self.status in ['REQUESTED', 'IN_PROGRESS']
+        return self.status in self.CANCELLABLE_STATUSES
 
     def mark_completed(self):
         """Mark test as completed"""
-        if self.status != 'COMPLETED':
+        if self.status == 'COMPLETED':
+            return
+        if self.status == 'CANCELLED':
+            raise ValidationError({'status': 'Cannot change status from cancelled'})
+        now = timezone.now()
+        # Single UPDATE; the status guard stands in for the transition checks in clean()
+        updated = LabRequest.objects.filter(pk=self.pk).exclude(status__in=['COMPLETED', 'CANCELLED']).update(
+            status='COMPLETED', completed_date=now
+        )
+        if updated:
             self.status = 'COMPLETED'
-            self.completed_date = timezone.now()
-            self.save()
+            self.completed_date = now
+        else:
+            self.refresh_from_db(fields=['status', 'completed_date'])
+        self._loaded_status = self.status
 
     def __str__(self):
         patient_name = "Unknown"
-        if self.appointment and hasattr(self.appointment, 'patient'):
+        if self.appointment_id is not None:
             patient_name = self.appointment.patient.name
         return f"{self.test_name} - {patient_name}"
\ No newline at end of file
@@ -1,20 +1,27 @@
 # doctor/serializers.py
 from rest_framework import serializers
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, connection, transaction
+from django.utils.functional import cached_property
+from collections import defaultdict
+from datetime import date
+from operator import attrgetter
 from receptionist.models import Appointment, Patient
 from adminapp.models import Staff
+from CMS.api import CachedFieldsMixin
 from .models import Diagnosis, Prescription, LabRequest
 
-class PatientMiniSerializer(serializers.ModelSerializer):
+class PatientMiniSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Patient
         fields = ['id', 'name', 'age', 'gender', 'phone', 'blood_group']
 
-class DoctorAppointmentSerializer(serializers.ModelSerializer):
+class DoctorAppointmentSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     patient_details = PatientMiniSerializer(source='patient', read_only=True)
-    doctor_name = serializers.CharField(source='doctor.full_name', read_only=True)
-    is_urgent = serializers.SerializerMethodField()
+    doctor_name = serializers.CharField(source='doctor_name_cached', read_only=True)
+    is_urgent = serializers.BooleanField(read_only=True)
     is_today = serializers.SerializerMethodField()
-    can_start_consultation = serializers.SerializerMethodField()
+    can_start_consultation = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = Appointment
@@ -28,26 +35,80 @@ class DoctorAppointmentSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'updated_at']
     
-    def get_is_urgent(self, obj):
-        return obj.priority == 'URGENT'
+    @cached_property
+    def today(self):
+        # The view passes its request date; with many=True this child serializer is shared by every row
+        return self.context.get('today') or date.today()
     
     def get_is_today(self, obj):
-        from datetime import date
-        return obj.appointment_date == date.today()
-    
-    def get_can_start_consultation(self, obj):
-        return obj.status in ['SCHEDULED', 'CONFIRMED']
+        return obj.appointment_date == self.today
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """
+    Insert a validated batch with bulk_create instead of one save() per row.
+    
+    MySQL does not report the ids of a multi-row INSERT, so on backends that cannot return
+    rows from it the batch is read back inside the same transaction and matched to the input
+    by the child serializer's bulk_key_fields (fields that tell the rows of one batch apart).
+    """
+    batch_size = 500
+    
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objs = [model(**attrs) for attrs in validated_data]
+        # Model rules that save() would apply row by row; constraints are left to the INSERT.
+        # Errors are keyed by row index, the same shape ListSerializer uses for field errors
+        errors = {index: detail for index, detail in enumerate(map(self._clean, objs)) if detail}
+        if errors:
+            raise serializers.ValidationError(errors)
+        try:
+            with transaction.atomic():
+                created = model.objects.bulk_create(objs, batch_size=self.batch_size)
+                if not connection.features.can_return_rows_from_bulk_insert:
+                    created = self._refetch(model, created)
+                return created
+        except IntegrityError as e:
+            constraint_errors = getattr(self.child, 'constraint_errors', {})
+            for name, detail in constraint_errors.items():
+                if name in str(e):
+                    raise serializers.ValidationError(detail)
+            raise
+    
+    def _refetch(self, model, objs):
+        key_fields = self.child.bulk_key_fields
+        key = attrgetter(*key_fields)
+        # Each field narrows to the batch's values; exact rows are then matched in Python
+        stored = defaultdict(list)
+        rows = model.objects.filter(**{f'{field}__in': {getattr(obj, field) for obj in objs} for field in key_fields})
+        for row in rows.order_by('pk'):
+            stored[key(row)].append(row)
+        return [stored[key(obj)].pop(0) for obj in objs]
+    
+    @staticmethod
+    def _clean(obj):
+        try:
+            obj.full_clean(validate_constraints=False)
+        except DjangoValidationError as e:
+            return e.message_dict
+        return {}
 
 # Keep your existing serializers for Diagnosis, Prescription, LabRequest
-class DiagnosisSerializer(serializers.ModelSerializer):
+class DiagnosisSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     patient_info = serializers.SerializerMethodField(read_only=True)
     condition_summary = serializers.SerializerMethodField(read_only=True)
     requires_immediate_attention = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = Diagnosis
-        fields = '__all__'
+        fields = [
+            'id', 'appointment', 'doctor', 'symptoms', 'diagnosis', 'severity',
+            'notes', 'created_at', 'updated_at', 'follow_up_required',
+            'follow_up_date', 'is_chronic',
+            'patient_info', 'condition_summary', 'requires_immediate_attention'
+        ]
         read_only_fields = ['created_at', 'updated_at']
+        # Duplicates are rejected by the unique index on insert (see Diagnosis.save)
+        extra_kwargs = {'appointment': {'validators': []}}
     
     def get_patient_info(self, obj):
         return obj.get_patient_info()
@@ -55,31 +116,39 @@ class DiagnosisSerializer(serializers.ModelSerializer):
     def get_condition_summary(self, obj):
         return obj.get_condition_summary()
     
-    def validate_symptoms(self, value):
-        if len(value.strip()) < 10:
-            raise serializers.ValidationError('Symptoms description must be at least 10 characters')
-        if len(value.strip()) > 10000:
-            raise serializers.ValidationError('Symptoms description too long (max 10000 characters)')
-        return value
-    
-    def validate_diagnosis(self, value):
-        if len(value.strip()) < 5:
-            raise serializers.ValidationError('Diagnosis must be at least 5 characters')
-        if len(value.strip().split()) < 2:
-            raise serializers.ValidationError('Diagnosis should contain at least 2 words')
-        if len(value) > 5000:
-            raise serializers.ValidationError('Diagnosis too long (max 5000 characters)')
-        return value
+    def create(self, validated_data):
+        try:
+            return super().create(validated_data)
+        except DjangoValidationError as e:
+            # Raised by Diagnosis.save for a second diagnosis on the same appointment
+            raise serializers.ValidationError(e.message_dict)
+    
+    def update(self, instance, validated_data):
+        try:
+            return super().update(instance, validated_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.message_dict)
 
-class PrescriptionSerializer(serializers.ModelSerializer):
+class PrescriptionSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     duration_display = serializers.SerializerMethodField(read_only=True)
     frequency_display_full = serializers.SerializerMethodField(read_only=True)
     is_long_term = serializers.BooleanField(read_only=True)
     
+    # Database constraint name -> error, for rows written without save()
+    constraint_errors = {'uniq_appt_medicine_ci': {'medicine_name': 'Medicine is already prescribed for this appointment'}}
+    # Identifies a row of one bulk_create batch when the backend cannot return its id
+    bulk_key_fields = ('appointment_id', 'medicine_name', 'created_at')
+    
     class Meta:
         model = Prescription
-        fields = '__all__'
+        fields = [
+            'id', 'appointment', 'doctor', 'medicine_name', 'dosage', 'frequency',
+            'duration', 'duration_unit', 'quantity', 'instructions', 'created_at',
+            'is_active', 'is_controlled',
+            'duration_display', 'frequency_display_full', 'is_long_term'
+        ]
         read_only_fields = ['created_at']
+        list_serializer_class = BulkCreateListSerializer
     
     def get_duration_display(self, obj):
         return obj.get_duration_display()
@@ -87,33 +156,44 @@ class PrescriptionSerializer(serializers.ModelSerializer):
     def get_frequency_display_full(self, obj):
         return obj.get_frequency_display_full()
     
-    def validate_medicine_name(self, value):
-        if len(value.strip()) < 2:
-            raise serializers.ValidationError('Medicine name must be at least 2 characters')
-        if len(value) > 100:
-            raise serializers.ValidationError('Medicine name too long (max 100 characters)')
-        return value.strip()
+    def create(self, validated_data):
+        try:
+            return super().create(validated_data)
+        except DjangoValidationError as e:
+            # Raised by Prescription.save for a duplicate medicine on the same appointment
+            raise serializers.ValidationError(e.message_dict)
+    
+    def update(self, instance, validated_data):
+        try:
+            return super().update(instance, validated_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.message_dict)
 
-class LabRequestSerializer(serializers.ModelSerializer):
+class LabRequestSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     patient_info = serializers.SerializerMethodField(read_only=True)
     test_info = serializers.SerializerMethodField(read_only=True)
     is_urgent = serializers.BooleanField(read_only=True)
     turnaround_time = serializers.DurationField(read_only=True)
     
+    # Identifies a row of one bulk_create batch when the backend cannot return its id
+    bulk_key_fields = ('appointment_id', 'test_name', 'requested_date')
+    
     class Meta:
         model = LabRequest
-        fields = '__all__'
+        fields = [
+            'id', 'appointment', 'doctor', 'test_name', 'test_type',
+            'test_description', 'status', 'priority', 'specimen_type',
+            'special_instructions', 'requested_date', 'completed_date',
+            'is_fasting_required', 'estimated_duration',
+            'patient_info', 'test_info', 'is_urgent', 'turnaround_time'
+        ]
         read_only_fields = ['requested_date', 'completed_date']
+        list_serializer_class = BulkCreateListSerializer
+        # DRF turns the model's MinLengthValidator into min_length and drops its message
+        extra_kwargs = {'test_name': {'error_messages': {'min_length': 'Test name must be at least 2 characters'}}}
     
     def get_patient_info(self, obj):
         return obj.get_patient_info()
     
     def get_test_info(self, obj):
         return obj.get_test_info()
-    
-    def validate_test_name(self, value):
-        if len(value.strip()) < 2:
-            raise serializers.ValidationError('Test name must be at least 2 characters')
-        if len(value) > 100:
-            raise serializers.ValidationError('Test name too long (max 100 characters)')
-        return value.strip()
\ No newline at end of file
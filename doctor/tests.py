@@ -1,3 +1,186 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from CMS.db import is_duplicate_key
+from adminapp.models import Staff
+from receptionist.models import Appointment, Patient
+from .models import Diagnosis, LabRequest, Prescription
+
+
+def make_staff(role, email):
+    staff = Staff(full_name=f'Test {role.title()}', email=email, role=role)
+    staff.set_password('Passw0rdX')
+    staff.save()
+    return staff
+
+
+class DoctorApiTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.receptionist = make_staff('RECEPTIONIST', 'reception@hospital.com')
+        cls.doctor = make_staff('DOCTOR', 'doctor@hospital.com')
+        patient = Patient.objects.create(
+            name='John Doe', age=30, gender='MALE', address='123 Long Street Address',
+            phone='9876543210', created_by=cls.receptionist,
+        )
+        cls.appointment = Appointment.objects.create(
+            patient=patient, doctor=cls.doctor, created_by=cls.receptionist,
+            appointment_date=datetime.date.today() + datetime.timedelta(days=1),
+            appointment_time=datetime.time(10, 0), purpose='Follow-up consultation',
+        )
+        Appointment.objects.filter(pk=cls.appointment.pk).update(status='COMPLETED')
+        cls.appointment.refresh_from_db()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('doctor', 'doctor@hospital.com', 'Passw0rdX'))
+
+    def prescription(self, medicine_name, **fields):
+        return {
+            'appointment': self.appointment.pk, 'doctor': self.doctor.pk, 'medicine_name': medicine_name,
+            'dosage': '500mg', 'frequency': 'BD', 'duration': 5, 'duration_unit': 'DAYS',
+            'instructions': 'Take after food', **fields,
+        }
+
+    def lab_request(self, test_name, **fields):
+        return {
+            'appointment': self.appointment.pk, 'doctor': self.doctor.pk, 'test_name': test_name,
+            'test_type': 'BLOOD_TEST', **fields,
+        }
+
+
+class BulkCreateTests(DoctorApiTestCase):
+    def test_bulk_create_prescriptions(self):
+        rows = [self.prescription(name) for name in ('Paracetamol', 'Morphine sulfate', 'Cetirizine')]
+        response = self.client.post('/doctor/prescriptions/bulk_create/', rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['medicine_name'] for row in response.data], ['Paracetamol', 'Morphine sulfate', 'Cetirizine'])
+        # The per-row model rules still run without save()
+        self.assertEqual([row['is_controlled'] for row in response.data], [False, True, False])
+        self.assertEqual(
+            [row['id'] for row in response.data],
+            list(Prescription.objects.filter(appointment=self.appointment).order_by('pk').values_list('pk', flat=True)),
+        )
+
+    def test_bulk_create_returns_ids_when_backend_cannot(self):
+        # MySQL leaves the pks of a bulk insert unset; the serializer reads the batch back
+        rows = [self.prescription(name) for name in ('Paracetamol', 'Cetirizine')] + [self.prescription('Zinc', dosage='50mg')]
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            response = self.client.post('/doctor/prescriptions/bulk_create/', rows, format='json')
+            lab_response = self.client.post('/doctor/lab-requests/bulk_create/', [self.lab_request('CBC count')], format='json')
+        self.assertEqual(response.status_code, 201)
+        stored = dict(Prescription.objects.values_list('medicine_name', 'pk'))
+        self.assertEqual([(row['medicine_name'], row['id']) for row in response.data], [
+            ('Paracetamol', stored['Paracetamol']), ('Cetirizine', stored['Cetirizine']), ('Zinc', stored['Zinc']),
+        ])
+        self.assertEqual(lab_response.data[0]['id'], LabRequest.objects.get().pk)
+
+    def test_bulk_create_prescriptions_reports_row_errors(self):
+        rows = [self.prescription('Paracetamol'), self.prescription('Ibuprofen', duration=0)]
+        response = self.client.post('/doctor/prescriptions/bulk_create/', rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data[1]), ['duration'])
+        self.assertFalse(Prescription.objects.exists())
+
+    def test_bulk_create_prescriptions_rejects_duplicate_medicine(self):
+        self.client.post('/doctor/prescriptions/bulk_create/', [self.prescription('Paracetamol')], format='json')
+        response = self.client.post('/doctor/prescriptions/bulk_create/', [self.prescription('PARACETAMOL')], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('medicine_name', response.data)
+        self.assertEqual(Prescription.objects.count(), 1)
+
+    def test_bulk_create_lab_requests(self):
+        rows = [self.lab_request(name) for name in ('Lipid profile', 'CBC count')]
+        response = self.client.post('/doctor/lab-requests/bulk_create/', rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['test_name'] for row in response.data], ['Lipid profile', 'CBC count'])
+        self.assertEqual([row['is_fasting_required'] for row in response.data], [True, False])
+        self.assertEqual(LabRequest.objects.filter(appointment=self.appointment).count(), 2)
+
+
+class DirectUpdateActionTests(DoctorApiTestCase):
+    def test_malformed_pk_is_not_found(self):
+        for url in ('/doctor/prescriptions/abc/deactivate/', '/doctor/prescriptions/abc/activate/',
+                    '/doctor/lab-requests/abc/cancel/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.post(url).status_code, 404)
+
+    def test_deactivate_prescription(self):
+        self.client.post('/doctor/prescriptions/bulk_create/', [self.prescription('Paracetamol')], format='json')
+        prescription = Prescription.objects.get()
+        response = self.client.post(f'/doctor/prescriptions/{prescription.pk}/deactivate/')
+        self.assertEqual(response.status_code, 200)
+        prescription.refresh_from_db()
+        self.assertFalse(prescription.is_active)
+
+    def test_cancel_lab_request(self):
+        self.client.post('/doctor/lab-requests/bulk_create/', [self.lab_request('CBC count')], format='json')
+        lab_request = LabRequest.objects.get()
+        self.assertEqual(self.client.post(f'/doctor/lab-requests/{lab_request.pk}/cancel/').status_code, 200)
+        lab_request.refresh_from_db()
+        self.assertEqual(lab_request.status, 'CANCELLED')
+        self.assertEqual(self.client.post(f'/doctor/lab-requests/{lab_request.pk + 1}/cancel/').status_code, 404)
+
+
+class DiagnosisTests(DoctorApiTestCase):
+    def test_second_diagnosis_for_appointment_is_a_validation_error(self):
+        fields = {
+            'appointment': self.appointment, 'doctor': self.doctor,
+            'symptoms': 'Persistent dry cough', 'diagnosis': 'Upper respiratory tract infection',
+        }
+        Diagnosis.objects.create(**fields)
+        with self.assertRaisesMessage(ValidationError, 'Diagnosis already exists for this appointment'):
+            Diagnosis.objects.create(**fields)
+
+    def test_duplicate_key_is_told_apart_from_foreign_key_failure(self):
+        duplicate = IntegrityError(1062, "Duplicate entry '7' for key 'doctor_diagnosis.appointment_id'")
+        foreign_key = IntegrityError(1452, (
+            'Cannot add or update a child row: a foreign key constraint fails (`care_life`.`doctor_diagnosis`, '
+            'CONSTRAINT `doctor_diagnosis_appointment_id_fk` FOREIGN KEY (`appointment_id`) '
+            'REFERENCES `receptionist_appointment` (`id`))'
+        ))
+        self.assertTrue(is_duplicate_key(duplicate, 'appointment_id'))
+        self.assertFalse(is_duplicate_key(foreign_key, 'appointment_id'))
+        self.assertFalse(is_duplicate_key(duplicate, 'doctor_id'))
+        self.assertTrue(is_duplicate_key(IntegrityError('UNIQUE constraint failed: doctor_diagnosis.appointment_id'), 'appointment_id'))
+
+
+class DashboardTests(DoctorApiTestCase):
+    def test_controlled_substances_are_capped_newest_first(self):
+        rows = [self.prescription(name) for name in ('Morphine sulfate', 'Oxycodone', 'Fentanyl patch', 'Paracetamol')]
+        self.client.post('/doctor/prescriptions/bulk_create/', rows, format='json')
+        with mock.patch('doctor.views.DASHBOARD_CONTROLLED_LIMIT', 2):
+            response = self.client.get('/doctor/appointments/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        newest = Prescription.objects.filter(is_controlled=True).order_by('-created_at')[:2]
+        self.assertEqual([row['id'] for row in response.data['controlled_substances']], [p.pk for p in newest])
 
-# Create your tests here.
+    def test_follow_ups_match_the_follow_up_action(self):
+        diagnoses = []
+        for hour in (11, 12):
+            appointment = Appointment.objects.create(
+                patient=self.appointment.patient, doctor=self.doctor, created_by=self.receptionist,
+                appointment_date=self.appointment.appointment_date, appointment_time=datetime.time(hour, 0),
+                purpose='Review visit',
+            )
+            Appointment.objects.filter(pk=appointment.pk).update(status='COMPLETED')
+            appointment.refresh_from_db()
+            diagnoses.append(Diagnosis.objects.create(
+                appointment=appointment, doctor=self.doctor, severity='LOW',
+                symptoms='Persistent dry cough', diagnosis='Upper respiratory tract infection',
+                follow_up_required=True, follow_up_date=appointment.appointment_date + datetime.timedelta(days=7),
+            ))
+        # One follow-up due today, one already past
+        today = datetime.date.today()
+        Diagnosis.objects.filter(pk=diagnoses[0].pk).update(follow_up_date=today)
+        Diagnosis.objects.filter(pk=diagnoses[1].pk).update(follow_up_date=today - datetime.timedelta(days=1))
+        dashboard = self.client.get('/doctor/appointments/dashboard/').data['follow_up_required']
+        follow_ups = self.client.get('/doctor/diagnoses/follow_up_required/').data['results']
+        self.assertEqual([row['id'] for row in dashboard], [diagnoses[0].pk])
+        self.assertEqual([row['id'] for row in follow_ups], [diagnoses[0].pk])
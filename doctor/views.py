@@ -2,13 +2,17 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
+from django.http import Http404
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Count, F, Q
+from django.utils.functional import cached_property
 from datetime import date, datetime, timedelta
+import logging
 
 from receptionist.models import Appointment, Patient
 from adminapp.models import Staff
+from CMS.api import EagerLoadingMixin, PaginatedActionMixin, PkFilterMixin
 from .models import Diagnosis, Prescription, LabRequest
 from .serializers import (
     DoctorAppointmentSerializer,
@@ -17,96 +21,154 @@ from .serializers import (
     LabRequestSerializer
 )
 
-class DoctorAppointmentViewSet(viewsets.ModelViewSet):
+logger = logging.getLogger(__name__)
+
+# Statuses a doctor may set through update_status
+_VALID_APPOINTMENT_STATUSES = frozenset({'SCHEDULED', 'CONFIRMED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED'})
+
+# Columns DoctorAppointmentSerializer renders, including the joined patient
+APPOINTMENT_READ_FIELDS = (
+    'id', 'patient', 'doctor', 'doctor_name_cached', 'appointment_date',
+    'appointment_time', 'purpose', 'status', 'priority', 'symptoms', 'notes',
+    'estimated_duration', 'actual_duration', 'check_in_time', 'check_out_time',
+    'created_at',
+    'patient__id', 'patient__name', 'patient__age', 'patient__gender',
+    'patient__phone', 'patient__blood_group',
+)
+
+# Diagnosis and lab-request columns, plus the patient name and age patient_info reads through the appointment
+DIAGNOSIS_READ_FIELDS = (
+    'id', 'appointment', 'doctor', 'symptoms', 'diagnosis', 'severity', 'notes',
+    'created_at', 'updated_at', 'follow_up_required', 'follow_up_date', 'is_chronic',
+    'appointment__patient', 'appointment__patient__name', 'appointment__patient__age',
+)
+# Prescription columns PrescriptionSerializer renders; it reads no relations
+PRESCRIPTION_READ_FIELDS = (
+    'id', 'appointment', 'doctor', 'medicine_name', 'dosage', 'frequency', 'duration',
+    'duration_unit', 'quantity', 'instructions', 'created_at', 'is_active', 'is_controlled',
+)
+# Newest controlled prescriptions the dashboard shows; the full history is paged by
+# PrescriptionViewSet.controlled_substances
+DASHBOARD_CONTROLLED_LIMIT = 50
+LAB_REQUEST_READ_FIELDS = (
+    'id', 'appointment', 'doctor', 'test_name', 'test_type', 'test_description',
+    'status', 'priority', 'specimen_type', 'special_instructions', 'requested_date',
+    'completed_date', 'is_fasting_required', 'estimated_duration',
+    'appointment__patient', 'appointment__patient__name', 'appointment__patient__age',
+)
+
+class CurrentDoctorMixin:
+    """The doctor these endpoints are scoped to and the request date, each looked up once per request"""
+    
+    @cached_property
+    def current_doctor(self):
+        # Only the id is used, to filter by doctor
+        return Staff.objects.filter(role='DOCTOR').only('id').first()
+    
+    @cached_property
+    def today(self):
+        """Today's date, read once per request so every list and serializer in it agrees"""
+        return date.today()
+
+class DoctorAppointmentViewSet(CurrentDoctorMixin, EagerLoadingMixin, PaginatedActionMixin, viewsets.ModelViewSet):
     """
     ViewSet for doctors to view their appointments from receptionist
     """
+    queryset = Appointment.objects.all()
     serializer_class = DoctorAppointmentSerializer
     permission_classes = [IsAuthenticated]
     http_method_names = ['get', 'patch', 'put', 'post']  # Remove delete
+    select_related_fields = ('patient',)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['today'] = self.today
+        return context
     
     def get_queryset(self):
         """
         Return appointments for doctors
         """
-        print("DEBUG - Getting appointments for doctor...")
-        
-        # Get all appointments first
-        queryset = Appointment.objects.all()
-        print(f"DEBUG - Total appointments in system: {queryset.count()}")
+        queryset = self.get_base_queryset()
         
         # Try to filter by doctor if possible
         try:
-            doctors = Staff.objects.filter(role='DOCTOR')
-            if doctors.exists():
-                doctor_staff = doctors.first()
+            doctor_staff = self.current_doctor
+            if doctor_staff is not None:
                 queryset = queryset.filter(doctor=doctor_staff)
-                print(f"DEBUG - Filtered by doctor: {doctor_staff.full_name}")
-            else:
-                print("DEBUG - No doctors found, showing all appointments")
         except Exception as e:
-            print(f"DEBUG - Error filtering by doctor: {e}")
+            logger.warning("Error filtering appointments by doctor: %s", e)
         
         # Apply URL filters
         status_filter = self.request.query_params.get('status')
         date_filter = self.request.query_params.get('date')
         priority_filter = self.request.query_params.get('priority')
         patient_name = self.request.query_params.get('patient_name')
+        patient_name_prefix = self.request.query_params.get('patient_name_prefix')
         
         if status_filter:
             queryset = queryset.filter(status=status_filter)
-            print(f"DEBUG - Filtered by status: {status_filter}")
         if date_filter:
             queryset = queryset.filter(appointment_date=date_filter)
-            print(f"DEBUG - Filtered by date: {date_filter}")
         if priority_filter:
             queryset = queryset.filter(priority=priority_filter)
-            print(f"DEBUG - Filtered by priority: {priority_filter}")
         if patient_name:
             queryset = queryset.filter(patient__name__icontains=patient_name)
-            print(f"DEBUG - Filtered by patient name: {patient_name}")
+        if patient_name_prefix:
+            # A leading-anchored LIKE can use the index on Patient.name; the substring search above cannot
+            queryset = queryset.filter(patient__name__istartswith=patient_name_prefix)
         
-        print(f"DEBUG - Final result: {queryset.count()} appointments")
-        return queryset.select_related('patient', 'doctor').order_by('appointment_date', 'appointment_time')
+        queryset = queryset.order_by('appointment_date', 'appointment_time')
+        if self.request.method in SAFE_METHODS:
+            # Reads only need the serialized columns; the doctor's name comes from doctor_name_cached
+            queryset = queryset.only(*APPOINTMENT_READ_FIELDS)
+        else:
+            # Writes keep full rows because Appointment.save() runs full_clean(), which reads the doctor
+            queryset = queryset.select_related('doctor')
+        return queryset
     
     @action(detail=False, methods=['get'])
     def todays_appointments(self, request):
         """Get today's appointments for the doctor"""
-        queryset = self.get_queryset().filter(appointment_date=date.today())
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = self.get_queryset().filter(appointment_date=self.today)
+        if request.query_params.get('slim'):
+            # Plain dicts straight from the cursor: no model instances and no serializer
+            queryset = queryset.values('id', 'appointment_time', 'status', 'priority', patient_name=F('patient__name'))
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(page)
+            return Response(list(queryset))
+        return self.paginated_response(queryset)
     
     @action(detail=False, methods=['get'])
     def upcoming_appointments(self, request):
         """Get upcoming appointments (next 7 days)"""
-        start_date = date.today()
+        start_date = self.today
         end_date = start_date + timedelta(days=7)
         
         queryset = self.get_queryset().filter(
             appointment_date__range=[start_date, end_date],
-            status__in=['SCHEDULED', 'CONFIRMED']
+            status__in=Appointment.PENDING_STATUSES
         )
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(queryset)
     
     @action(detail=False, methods=['get'])
     def pending_appointments(self, request):
         """Get pending appointments (scheduled and confirmed)"""
         queryset = self.get_queryset().filter(
-            status__in=['SCHEDULED', 'CONFIRMED']
+            status__in=Appointment.PENDING_STATUSES
         )
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(queryset)
     
     @action(detail=True, methods=['post'])
     def start_consultation(self, request, pk=None):
         """Mark appointment as in progress"""
         appointment = self.get_object()
         
-        if appointment.status in ['SCHEDULED', 'CONFIRMED']:
+        if appointment.can_start_consultation():
             appointment.status = 'IN_PROGRESS'
             appointment.check_in_time = timezone.now()
-            appointment.save()
+            appointment.save(update_fields=['status', 'check_in_time'])
             
             serializer = self.get_serializer(appointment)
             return Response({
@@ -127,10 +189,12 @@ class DoctorAppointmentViewSet(viewsets.ModelViewSet):
         
         if appointment.status == 'IN_PROGRESS':
             appointment.status = 'COMPLETED'
+            update_fields = ['status', 'check_out_time']
             if actual_duration:
                 appointment.actual_duration = actual_duration
+                update_fields.append('actual_duration')
             appointment.check_out_time = timezone.now()
-            appointment.save()
+            appointment.save(update_fields=update_fields)
             
             serializer = self.get_serializer(appointment)
             return Response({
@@ -149,11 +213,10 @@ class DoctorAppointmentViewSet(viewsets.ModelViewSet):
         appointment = self.get_object()
         new_status = request.data.get('status')
         
-        valid_statuses = ['SCHEDULED', 'CONFIRMED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED']
-        
-        if new_status in valid_statuses:
+        # A JSON list or object is unhashable, so check the type before the set lookup
+        if isinstance(new_status, str) and new_status in _VALID_APPOINTMENT_STATUSES:
             appointment.status = new_status
-            appointment.save()
+            appointment.save(update_fields=['status'])
             
             serializer = self.get_serializer(appointment)
             return Response({
@@ -169,28 +232,70 @@ class DoctorAppointmentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get appointment statistics for the doctor"""
-        queryset = self.get_queryset()
+        # Every figure comes from one conditional aggregate over the filtered appointments
+        stats = self.get_queryset().aggregate(
+            total_appointments=Count('pk'),
+            todays_appointments=Count('pk', filter=Q(appointment_date=self.today)),
+            scheduled=Count('pk', filter=Q(status='SCHEDULED')),
+            confirmed=Count('pk', filter=Q(status='CONFIRMED')),
+            in_progress=Count('pk', filter=Q(status='IN_PROGRESS')),
+            completed=Count('pk', filter=Q(status='COMPLETED')),
+            cancelled=Count('pk', filter=Q(status='CANCELLED')),
+            urgent_cases=Count('pk', filter=Q(priority='URGENT')),
+        )
         
-        total_appointments = queryset.count()
-        todays_appointments = queryset.filter(appointment_date=date.today()).count()
+        return Response(stats)
+    
+    @action(detail=False, methods=['get'])
+    def dashboard(self, request):
+        """Critical, follow-up, controlled, urgent and pending lists in one call, one query per model"""
+        doctor_staff = self.current_doctor
+        if doctor_staff is None:
+            return Response({})
+        today = self.today
+        context = self.get_serializer_context()
         
-        stats = {
-            'total_appointments': total_appointments,
-            'todays_appointments': todays_appointments,
-            'scheduled': queryset.filter(status='SCHEDULED').count(),
-            'confirmed': queryset.filter(status='CONFIRMED').count(),
-            'in_progress': queryset.filter(status='IN_PROGRESS').count(),
-            'completed': queryset.filter(status='COMPLETED').count(),
-            'cancelled': queryset.filter(status='CANCELLED').count(),
-            'urgent_cases': queryset.filter(priority='URGENT').count(),
-        }
+        # The union of both diagnosis lists, split in Python after serializing each row once
+        diagnoses = list(Diagnosis.objects.filter(
+            Q(severity__in=['HIGH', 'CRITICAL']) | Q(follow_up_required=True, follow_up_date__gte=today),
+            doctor=doctor_staff,
+        ).select_related('appointment__patient').only(*DIAGNOSIS_READ_FIELDS))
+        diagnosis_data = DiagnosisSerializer(diagnoses, many=True, context=context).data
         
-        return Response(stats)
+        # Urgent requests are the REQUESTED subset of the pending ones
+        lab_requests = list(LabRequest.objects.filter(
+            doctor=doctor_staff,
+            status__in=['REQUESTED', 'IN_PROGRESS'],
+        ).select_related('appointment__patient').only(*LAB_REQUEST_READ_FIELDS))
+        lab_request_data = LabRequestSerializer(lab_requests, many=True, context=context).data
+        
+        controlled = Prescription.objects.filter(
+            doctor=doctor_staff, is_controlled=True,
+        ).only(*PRESCRIPTION_READ_FIELDS).order_by('-created_at')[:DASHBOARD_CONTROLLED_LIMIT]
+        
+        return Response({
+            'critical_cases': [
+                data for obj, data in zip(diagnoses, diagnosis_data)
+                if obj.requires_immediate_attention()
+            ],
+            'follow_up_required': [
+                data for obj, data in zip(diagnoses, diagnosis_data)
+                if obj.follow_up_required and obj.follow_up_date and obj.follow_up_date >= today
+            ],
+            'controlled_substances': PrescriptionSerializer(controlled, many=True, context=context).data,
+            'urgent_requests': [
+                data for obj, data in zip(lab_requests, lab_request_data)
+                if obj.is_urgent() and obj.status == 'REQUESTED'
+            ],
+            'pending_tests': lab_request_data,
+        })
 
-class DiagnosisViewSet(viewsets.ModelViewSet):
+class DiagnosisViewSet(CurrentDoctorMixin, EagerLoadingMixin, PaginatedActionMixin, viewsets.ModelViewSet):
     queryset = Diagnosis.objects.all()
     serializer_class = DiagnosisSerializer
     permission_classes = [IsAuthenticated]
+    # patient_info reads appointment.patient on every row
+    select_related_fields = ('appointment__patient',)
     
     def get_queryset(self):
         """Filter diagnoses by current doctor"""
@@ -198,15 +303,14 @@ class DiagnosisViewSet(viewsets.ModelViewSet):
         
         try:
             # Try to get current user's doctor profile
-            doctors = Staff.objects.filter(role='DOCTOR')
-            if doctors.exists():
-                doctor_staff = doctors.first()
-                queryset = Diagnosis.objects.filter(doctor=doctor_staff)
+            doctor_staff = self.current_doctor
+            if doctor_staff is not None:
+                queryset = self.get_base_queryset().filter(doctor=doctor_staff)
             else:
-                queryset = Diagnosis.objects.all()
+                queryset = self.get_base_queryset()
         except Exception as e:
-            print(f"DEBUG - Error filtering diagnoses: {e}")
-            queryset = Diagnosis.objects.all()
+            logger.warning("Error filtering diagnoses: %s", e)
+            queryset = self.get_base_queryset()
         
         # Your existing filters
         appointment_id = self.request.query_params.get('appointment_id')
@@ -220,44 +324,43 @@ class DiagnosisViewSet(viewsets.ModelViewSet):
         if follow_up_required: 
             queryset = queryset.filter(follow_up_required=(follow_up_required.lower() == 'true'))
         
+        if self.request.method in SAFE_METHODS:
+            # Writes keep full rows; clean() compares against the appointment's doctor
+            queryset = queryset.only(*DIAGNOSIS_READ_FIELDS)
         return queryset
     
     @action(detail=False, methods=['get'])
     def critical_cases(self, request):
         """Get critical cases for current doctor"""
         try:
-            doctors = Staff.objects.filter(role='DOCTOR')
-            if doctors.exists():
-                doctor_staff = doctors.first()
-                critical_diagnoses = Diagnosis.objects.filter(
+            doctor_staff = self.current_doctor
+            if doctor_staff is not None:
+                critical_diagnoses = self.get_base_queryset().filter(
                     doctor=doctor_staff,
                     severity__in=['HIGH', 'CRITICAL']
-                )
-                serializer = self.get_serializer(critical_diagnoses, many=True)
-                return Response(serializer.data)
+                ).only(*DIAGNOSIS_READ_FIELDS)
+                return self.paginated_response(critical_diagnoses)
         except Exception as e:
-            print(f"DEBUG - Error in critical_cases: {e}")
+            logger.warning("Error in critical_cases: %s", e)
         return Response([])
     
     @action(detail=False, methods=['get'])
     def follow_up_required(self, request):
         """Get follow-up required cases for current doctor"""
         try:
-            doctors = Staff.objects.filter(role='DOCTOR')
-            if doctors.exists():
-                doctor_staff = doctors.first()
-                follow_up_diagnoses = Diagnosis.objects.filter(
+            doctor_staff = self.current_doctor
+            if doctor_staff is not None:
+                follow_up_diagnoses = self.get_base_queryset().filter(
                     doctor=doctor_staff,
                     follow_up_required=True, 
-                    follow_up_date__gte=timezone.now().date()
-                )
-                serializer = self.get_serializer(follow_up_diagnoses, many=True)
-                return Response(serializer.data)
+                    follow_up_date__gte=self.today
+                ).only(*DIAGNOSIS_READ_FIELDS)
+                return self.paginated_response(follow_up_diagnoses)
         except Exception as e:
-            print(f"DEBUG - Error in follow_up_required: {e}")
+            logger.warning("Error in follow_up_required: %s", e)
         return Response([])
 
-class PrescriptionViewSet(viewsets.ModelViewSet):
+class PrescriptionViewSet(CurrentDoctorMixin, EagerLoadingMixin, PaginatedActionMixin, PkFilterMixin, viewsets.ModelViewSet):
     queryset = Prescription.objects.all()
     serializer_class = PrescriptionSerializer
     permission_classes = [IsAuthenticated]
@@ -267,15 +370,14 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         try:
-            doctors = Staff.objects.filter(role='DOCTOR')
-            if doctors.exists():
-                doctor_staff = doctors.first()
-                queryset = Prescription.objects.filter(doctor=doctor_staff)
+            doctor_staff = self.current_doctor
+            if doctor_staff is not None:
+                queryset = self.get_base_queryset().filter(doctor=doctor_staff)
             else:
-                queryset = Prescription.objects.all()
+                queryset = self.get_base_queryset()
         except Exception as e:
-            print(f"DEBUG - Error filtering prescriptions: {e}")
-            queryset = Prescription.objects.all()
+            logger.warning("Error filtering prescriptions: %s", e)
+            queryset = self.get_base_queryset()
         
         # Your existing filters
         appointment_id = self.request.query_params.get('appointment_id')
@@ -293,54 +395,60 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def deactivate(self, request, pk=None):
-        prescription = self.get_object()
-        prescription.is_active = False
-        prescription.save()
+        # One UPDATE instead of fetching the row and saving it back
+        if not self.filter_pk(pk).update(is_active=False):
+            raise Http404
         return Response({'status': 'Prescription deactivated'})
     
     @action(detail=True, methods=['post'])
     def activate(self, request, pk=None):
-        prescription = self.get_object()
-        prescription.is_active = True
-        prescription.save()
+        if not self.filter_pk(pk).update(is_active=True):
+            raise Http404
         return Response({'status': 'Prescription activated'})
     
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """Create a list of prescriptions in one batched INSERT"""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
     @action(detail=False, methods=['get'])
     def controlled_substances(self, request):
         """Get controlled substances for current doctor"""
         try:
-            doctors = Staff.objects.filter(role='DOCTOR')
-            if doctors.exists():
-                doctor_staff = doctors.first()
-                controlled_prescriptions = Prescription.objects.filter(
+            doctor_staff = self.current_doctor
+            if doctor_staff is not None:
+                controlled_prescriptions = self.get_base_queryset().filter(
                     doctor=doctor_staff,
                     is_controlled=True
-                )
-                serializer = self.get_serializer(controlled_prescriptions, many=True)
-                return Response(serializer.data)
+                ).only(*PRESCRIPTION_READ_FIELDS)
+                return self.paginated_response(controlled_prescriptions)
         except Exception as e:
-            print(f"DEBUG - Error in controlled_substances: {e}")
+            logger.warning("Error in controlled_substances: %s", e)
         return Response([])
 
-class LabRequestViewSet(viewsets.ModelViewSet):
+class LabRequestViewSet(CurrentDoctorMixin, EagerLoadingMixin, PaginatedActionMixin, PkFilterMixin, viewsets.ModelViewSet):
     queryset = LabRequest.objects.all()
     serializer_class = LabRequestSerializer
     permission_classes = [IsAuthenticated]
+    # patient_info reads appointment.patient on every row
+    select_related_fields = ('appointment__patient',)
     
     def get_queryset(self):
         """Filter lab requests by current doctor"""
         user = self.request.user
         
         try:
-            doctors = Staff.objects.filter(role='DOCTOR')
-            if doctors.exists():
-                doctor_staff = doctors.first()
-                queryset = LabRequest.objects.filter(doctor=doctor_staff)
+            doctor_staff = self.current_doctor
+            if doctor_staff is not None:
+                queryset = self.get_base_queryset().filter(doctor=doctor_staff)
             else:
-                queryset = LabRequest.objects.all()
+                queryset = self.get_base_queryset()
         except Exception as e:
-            print(f"DEBUG - Error filtering lab requests: {e}")
-            queryset = LabRequest.objects.all()
+            logger.warning("Error filtering lab requests: %s", e)
+            queryset = self.get_base_queryset()
         
         # Your existing filters
         appointment_id = self.request.query_params.get('appointment_id')
@@ -354,6 +462,9 @@ class LabRequestViewSet(viewsets.ModelViewSet):
         if priority: 
             queryset = queryset.filter(priority=priority)
         
+        if self.request.method in SAFE_METHODS:
+            # Writes keep full rows; clean() compares against the appointment's doctor
+            queryset = queryset.only(*LAB_REQUEST_READ_FIELDS)
         return queryset
     
     @action(detail=True, methods=['post'])
@@ -364,44 +475,49 @@ class LabRequestViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
-        lab_request = self.get_object()
-        if not lab_request.can_be_cancelled():
+        queryset = self.filter_pk(pk)
+        # The status guard runs in the UPDATE; a miss is told apart only on the failure path
+        if not queryset.cancellable().update(status='CANCELLED'):
+            if not queryset.exists():
+                raise Http404
             return Response({'error': 'Cannot cancel this lab request'}, status=status.HTTP_400_BAD_REQUEST)
-        lab_request.status = 'CANCELLED'
-        lab_request.save()
         return Response({'status': 'Lab request cancelled'})
     
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """Create a list of lab requests in one batched INSERT"""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
     @action(detail=False, methods=['get'])
     def urgent_requests(self, request):
         """Get urgent requests for current doctor"""
         try:
-            doctors = Staff.objects.filter(role='DOCTOR')
-            if doctors.exists():
-                doctor_staff = doctors.first()
-                urgent_requests = LabRequest.objects.filter(
+            doctor_staff = self.current_doctor
+            if doctor_staff is not None:
+                urgent_requests = self.get_base_queryset().filter(
                     doctor=doctor_staff,
                     priority__in=['URGENT', 'STAT'], 
                     status='REQUESTED'
-                )
-                serializer = self.get_serializer(urgent_requests, many=True)
-                return Response(serializer.data)
+                ).only(*LAB_REQUEST_READ_FIELDS)
+                return self.paginated_response(urgent_requests)
         except Exception as e:
-            print(f"DEBUG - Error in urgent_requests: {e}")
+            logger.warning("Error in urgent_requests: %s", e)
         return Response([])
     
     @action(detail=False, methods=['get'])
     def pending_tests(self, request):
         """Get pending tests for current doctor"""
         try:
-            doctors = Staff.objects.filter(role='DOCTOR')
-            if doctors.exists():
-                doctor_staff = doctors.first()
-                pending_tests = LabRequest.objects.filter(
+            doctor_staff = self.current_doctor
+            if doctor_staff is not None:
+                pending_tests = self.get_base_queryset().filter(
                     doctor=doctor_staff,
                     status__in=['REQUESTED', 'IN_PROGRESS']
-                )
-                serializer = self.get_serializer(pending_tests, many=True)
-                return Response(serializer.data)
+                ).only(*LAB_REQUEST_READ_FIELDS)
+                return self.paginated_response(pending_tests)
         except Exception as e:
-            print(f"DEBUG - Error in pending_tests: {e}")
+            logger.warning("Error in pending_tests: %s", e)
         return Response([])
\ No newline at end of file
@@ -64,9 +64,9 @@ class LabEquipmentAdmin(admin.ModelAdmin):
     )
     
     def needs_calibration(self, obj):
-        return obj.needs_calibration()
+        return obj.needs_calibration
     needs_calibration.boolean = True
     
     def needs_maintenance(self, obj):
-        return obj.needs_maintenance()
+        return obj.needs_maintenance
     needs_maintenance.boolean = True
\ No newline at end of file
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapp', '0004_staff_name_idx'),
+        ('doctor', '0004_diagnosis_length_checks'),
+        ('labtechnician', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='labreport',
+            name='labtechnici_status_085328_idx',
+        ),
+        migrations.AddIndex(
+            model_name='labreport',
+            index=models.Index(fields=['status', 'priority', 'created_at'], name='lr_status_prio_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='labreport',
+            index=models.Index(fields=['is_critical_result', 'critical_result_acknowledged'], name='lr_critical_unack_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='labreport',
+            index=models.Index(fields=['technician', 'status'], name='lr_tech_status_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-15 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labtechnician', '0002_labreport_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='labequipment',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='labequipment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='labreport',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='labreport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
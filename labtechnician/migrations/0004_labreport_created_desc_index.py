@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-15 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapp', '0004_staff_name_idx'),
+        ('doctor', '0004_diagnosis_length_checks'),
+        ('labtechnician', '0003_labreport_equipment_auto_timestamps'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='labreport',
+            index=models.Index(fields=['-created_at'], name='lr_created_desc_idx'),
+        ),
+    ]
@@ -1,7 +1,107 @@
-from django.db import models
+import os
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection, models, transaction, IntegrityError
+from django.db.models import Q
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator, MinLengthValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.utils.functional import cached_property
+from CMS.db import is_duplicate_key
+
+# A result this fraction of the normal range width beyond either bound is critical.
+# Decimal like the range fields; a float factor cannot multiply a Decimal at all
+CRITICAL_RANGE_FRACTION = Decimal('0.2')
+# Result file types, checked against the file's extension with one set lookup
+VALID_RESULT_FILE_EXTENSIONS = frozenset({'.pdf', '.jpg', '.jpeg', '.png', '.doc', '.docx', '.txt'})
+REPORT_CACHED_PROPERTIES = ('is_overdue', 'is_urgent')
+EQUIPMENT_CACHED_PROPERTIES = ('needs_calibration', 'needs_maintenance')
+
+def lab_report_errors(report, now, original_status=None):
+    """
+    LabReport.clean()'s rules as a field -> message dict, filling in the derived fields
+    (completed/verification dates, result status) the same way. Reads only the report and
+    its technician and lab request, so a batch with those preloaded validates without queries.
+    """
+    errors = {}
+    
+    # Validate technician role
+    if report.technician and report.technician.role != 'LABTECH':
+        errors['technician'] = 'Only lab technician staff can create lab reports'
+    
+    # Validate status transitions (existing reports only)
+    if original_status is not None:
+        # Cannot change status from completed/verified without proper permissions
+        if original_status in LabReport.FINAL_STATUSES and report.status not in LabReport.FINAL_STATUSES:
+            errors['status'] = 'Cannot change status from completed/verified'
+        
+        # Cannot change status from rejected
+        if original_status == 'REJECTED' and report.status != 'REJECTED':
+            errors['status'] = 'Cannot change status from rejected'
+    
+    # Validate completed date
+    if report.status == 'COMPLETED' and not report.completed_date:
+        report.completed_date = now
+    elif report.status != 'COMPLETED' and report.completed_date:
+        errors['completed_date'] = 'Completed date can only be set for completed reports'
+    
+    # Validate verification
+    if report.status == 'VERIFIED':
+        if not report.verified_by_id:
+            errors['verified_by'] = 'Verified by doctor is required for verified reports'
+        if not report.verification_date:
+            report.verification_date = now
+    elif report.status != 'VERIFIED' and report.verified_by_id:
+        errors['verified_by'] = 'Verified by can only be set for verified reports'
+    
+    # Validate results
+    if report.status in LabReport.FINAL_STATUSES:
+        if not report.results and not report.result_file:
+            errors['results'] = 'Results or result file is required for completed reports'
+        
+        if not report.result_status:
+            errors['result_status'] = 'Result status is required for completed reports'
+    
+    # Validate quantitative results
+    if report.measured_value is not None:
+        if report.normal_range_min is None or report.normal_range_max is None:
+            errors['measured_value'] = 'Normal range must be specified when providing measured value'
+        else:
+            if report.measured_value < report.normal_range_min or report.measured_value > report.normal_range_max:
+                report.result_status = 'ABNORMAL'
+                
+                # Check for critical values (example thresholds)
+                margin = (report.normal_range_max - report.normal_range_min) * CRITICAL_RANGE_FRACTION
+                
+                if (report.measured_value < report.normal_range_min - margin or
+                    report.measured_value > report.normal_range_max + margin):
+                    report.is_critical_result = True
+                    report.result_status = 'CRITICAL'
+            else:
+                report.result_status = 'NORMAL'
+                report.is_critical_result = False
+    
+    # Validate critical results
+    if report.is_critical_result and report.status in LabReport.FINAL_STATUSES:
+        if not report.critical_result_acknowledged:
+            # This is a warning, not an error
+            pass
+    
+    # Validate test date
+    if report.test_date and report.test_date > now:
+        errors['test_date'] = 'Test date cannot be in the future'
+    
+    if report.lab_request and report.test_date:
+        if report.test_date.date() < report.lab_request.requested_date.date():
+            errors['test_date'] = 'Test date cannot be before lab request date'
+    
+    # Validate file type if provided
+    if report.result_file:
+        if os.path.splitext(report.result_file.name)[1].lower() not in VALID_RESULT_FILE_EXTENSIONS:
+            errors['result_file'] = 'Invalid file type. Allowed: PDF, Images, Documents, Text files'
+    
+    return errors
 
 class LabReport(models.Model):
     REPORT_STATUS_CHOICES = [
@@ -26,6 +126,13 @@ class LabReport(models.Model):
         ('STAT', 'STAT (Immediate)'),
     ]
 
+    # A report in a final status can only move to another final status; urgent priorities get the shorter deadline
+    FINAL_STATUSES = frozenset({'COMPLETED', 'VERIFIED'})
+    URGENT_PRIORITIES = frozenset({'URGENT', 'STAT'})
+    # Hours an open report may wait before it counts as overdue
+    URGENT_OVERDUE_HOURS = 24
+    ROUTINE_OVERDUE_HOURS = 72
+
     lab_request = models.OneToOneField(
         'doctor.LabRequest',  # Use string reference
         on_delete=models.CASCADE,
@@ -168,8 +275,8 @@ class LabReport(models.Model):
     )
     
     # System fields
-    created_at = models.DateTimeField(default=timezone.now)
-    updated_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     is_critical_result = models.BooleanField(
         default=False,
@@ -204,154 +311,222 @@ class LabReport(models.Model):
         indexes = [
             models.Index(fields=['lab_request']),
             models.Index(fields=['technician']),
-            models.Index(fields=['status']),
             models.Index(fields=['test_date']),
             models.Index(fields=['result_status']),
+            # Pending/overdue scans filter on status and priority and age by created_at;
+            # this also serves status-only filters, so there is no separate status index
+            models.Index(fields=['status', 'priority', 'created_at'], name='lr_status_prio_created_idx'),
+            # Unacknowledged critical results; MySQL has no partial indexes, so both flags are indexed
+            models.Index(fields=['is_critical_result', 'critical_result_acknowledged'], name='lr_critical_unack_idx'),
+            models.Index(fields=['technician', 'status'], name='lr_tech_status_idx'),
+            # Default ordering, so unfiltered list pages read the newest rows off the index
+            models.Index(fields=['-created_at'], name='lr_created_desc_idx'),
         ]
 
+    # Status as last read from or written to the database, for transition checks without a re-read
+    _loaded_status = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
     def clean(self):
         """Comprehensive lab report validation"""
-        errors = {}
-        
-        # Validate technician role
-        if self.technician and self.technician.role != 'LABTECH':
-            errors['technician'] = 'Only lab technician staff can create lab reports'
-        
-        # Validate status transitions
+        original_status = None
         if self.pk:  # Only for existing instances
-            try:
-                original = LabReport.objects.get(pk=self.pk)
-                
-                # Cannot change status from completed/verified without proper permissions
-                if original.status in ['COMPLETED', 'VERIFIED'] and self.status not in ['COMPLETED', 'VERIFIED']:
-                    errors['status'] = 'Cannot change status from completed/verified'
-                
-                # Cannot change status from rejected
-                if original.status == 'REJECTED' and self.status != 'REJECTED':
-                    errors['status'] = 'Cannot change status from rejected'
-            except LabReport.DoesNotExist:
-                pass
-        
-        # Validate completed date
-        if self.status == 'COMPLETED' and not self.completed_date:
-            self.completed_date = timezone.now()
-        elif self.status != 'COMPLETED' and self.completed_date:
-            errors['completed_date'] = 'Completed date can only be set for completed reports'
-        
-        # Validate verification
-        if self.status == 'VERIFIED':
-            if not self.verified_by:
-                errors['verified_by'] = 'Verified by doctor is required for verified reports'
-            if not self.verification_date:
-                self.verification_date = timezone.now()
-        elif self.status != 'VERIFIED' and self.verified_by:
-            errors['verified_by'] = 'Verified by can only be set for verified reports'
-        
-        # Validate results
-        if self.status in ['COMPLETED', 'VERIFIED']:
-            if not self.results and not self.result_file:
-                errors['results'] = 'Results or result file is required for completed reports'
-            
-            if not self.result_status:
-                errors['result_status'] = 'Result status is required for completed reports'
-        
-        # Validate quantitative results
-        if self.measured_value is not None:
-            if self.normal_range_min is None or self.normal_range_max is None:
-                errors['measured_value'] = 'Normal range must be specified when providing measured value'
-            else:
-                if self.measured_value < self.normal_range_min or self.measured_value > self.normal_range_max:
-                    self.result_status = 'ABNORMAL'
-                    
-                    # Check for critical values (example thresholds)
-                    critical_threshold = 0.2  # 20% outside normal range
-                    range_width = self.normal_range_max - self.normal_range_min
-                    
-                    if (self.measured_value < self.normal_range_min - (range_width * critical_threshold) or
-                        self.measured_value > self.normal_range_max + (range_width * critical_threshold)):
-                        self.is_critical_result = True
-                        self.result_status = 'CRITICAL'
-                else:
-                    self.result_status = 'NORMAL'
-                    self.is_critical_result = False
-        
-        # Validate critical results
-        if self.is_critical_result and self.status in ['COMPLETED', 'VERIFIED']:
-            if not self.critical_result_acknowledged:
-                # This is a warning, not an error
-                pass
-        
-        # Validate test date
-        if self.test_date and self.test_date > timezone.now():
-            errors['test_date'] = 'Test date cannot be in the future'
-        
-        if self.lab_request and self.test_date:
-            if self.test_date.date() < self.lab_request.requested_date.date():
-                errors['test_date'] = 'Test date cannot be before lab request date'
-        
-        # Validate file type if provided
-        if self.result_file:
-            valid_extensions = ['.pdf', '.jpg', '.jpeg', '.png', '.doc', '.docx', '.txt']
-            if not any(self.result_file.name.lower().endswith(ext) for ext in valid_extensions):
-                errors['result_file'] = 'Invalid file type. Allowed: PDF, Images, Documents, Text files'
+            original_status = self._loaded_status
+            if original_status is None:
+                # Built by hand or loaded with status deferred; fall back to reading the row
+                original_status = LabReport.objects.filter(pk=self.pk).values_list('status', flat=True).first()
         
+        errors = lab_report_errors(self, timezone.now(), original_status)
         if errors:
             raise ValidationError(errors)
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, skip_validation=False, **kwargs):
         """Override save to run validations and auto-update related models"""
-        self.full_clean()
+        # Internal flag updates skip the full pass and its relation lookups
+        if not skip_validation:
+            self.full_clean()
         
         # Auto-update lab request status when report is completed
-        if self.status == 'COMPLETED' and hasattr(self.lab_request, 'status'):
-            if self.lab_request.status != 'COMPLETED':
-                self.lab_request.status = 'COMPLETED'
-                self.lab_request.completed_date = timezone.now()
-                self.lab_request.save()
+        if self.status == 'COMPLETED' and self._loaded_status != 'COMPLETED':
+            self._complete_lab_request()
         
         # Auto-set priority from lab request
         if not self.priority and self.lab_request and hasattr(self.lab_request, 'priority'):
             self.priority = self.lab_request.priority
         
         super().save(*args, **kwargs)
+        self._loaded_status = self.status
+        self.clear_status_cache()
+
+    def clear_status_cache(self):
+        """Status or priority may have changed under the memoized values"""
+        for name in REPORT_CACHED_PROPERTIES:
+            self.__dict__.pop(name, None)
+
+    def _complete_lab_request(self):
+        """Mark the lab request completed with one UPDATE, without loading or re-validating it"""
+        now = timezone.now()
+        updated = self.complete_lab_requests([self.lab_request_id], now)
+        # Keep an already-loaded lab request in step with the row
+        if updated and self._meta.get_field('lab_request').is_cached(self):
+            self.lab_request.status = 'COMPLETED'
+            self.lab_request.completed_date = now
+
+    @staticmethod
+    def complete_lab_requests(lab_request_ids, now):
+        """Mark open lab requests completed in one UPDATE; returns the number of rows changed"""
+        from doctor.models import LabRequest
+
+        return LabRequest.objects.filter(pk__in=lab_request_ids).exclude(
+            status__in=['COMPLETED', 'CANCELLED']
+        ).update(status='COMPLETED', completed_date=now)
+
+    @classmethod
+    def bulk_create_reports(cls, reports, batch_size=500):
+        """
+        Insert many reports with batched INSERTs and one lab request UPDATE (imports).
+        
+        The batch is validated in memory first: field validators, the clean() rules via
+        lab_report_errors(), and the lab requests each report is for, with the technicians and
+        lab requests read in one query each. Errors are raised together, keyed by row index.
+        MySQL does not return the ids of a bulk insert, so there the rows are read back by
+        their (one-to-one) lab request inside the same transaction.
+        """
+        from adminapp.models import Staff
+        from doctor.models import LabRequest
+
+        reports = list(reports)
+        now = timezone.now()
+        lab_request_ids = [report.lab_request_id for report in reports]
+        lab_requests = LabRequest.objects.in_bulk(lab_request_ids)
+        technicians = Staff.objects.only('id', 'role').in_bulk({report.technician_id for report in reports})
+        reported = set(cls.objects.filter(lab_request_id__in=lab_request_ids).values_list('lab_request_id', flat=True))
+        
+        errors = {}
+        seen = set()
+        for index, report in enumerate(reports):
+            report.technician = technicians.get(report.technician_id)
+            report.lab_request = lab_requests.get(report.lab_request_id)
+            row_errors = {}
+            try:
+                report.clean_fields(exclude=['lab_request', 'technician', 'verified_by', 'critical_result_acknowledged_by'])
+            except ValidationError as e:
+                row_errors.update(e.message_dict)
+            if report.technician is None:
+                row_errors['technician'] = 'Technician does not exist'
+            if report.lab_request is None:
+                row_errors['lab_request'] = 'Lab request does not exist'
+            elif report.lab_request.status == 'CANCELLED':
+                row_errors['lab_request'] = 'Cannot report on a cancelled lab request'
+            elif report.lab_request_id in reported or report.lab_request_id in seen:
+                row_errors['lab_request'] = 'A report already exists for this lab request'
+            else:
+                row_errors = {**lab_report_errors(report, now), **row_errors}
+            seen.add(report.lab_request_id)
+            if row_errors:
+                # ValidationError cannot nest dicts; each row lists its errors as "field: message"
+                errors[index] = [
+                    f'{field}: {message}'
+                    for field, messages in row_errors.items()
+                    for message in (messages if isinstance(messages, list) else [messages])
+                ]
+        if errors:
+            raise ValidationError(errors)
+        
+        completed_ids = {report.lab_request_id for report in reports if report.status == 'COMPLETED'}
+        # The one-to-one lab_request index still rejects a duplicate inserted meanwhile
+        try:
+            with transaction.atomic():
+                created = cls.objects.bulk_create(reports, batch_size=batch_size)
+                if not connection.features.can_return_rows_from_bulk_insert:
+                    stored = {report.lab_request_id: report for report in cls.objects.filter(lab_request_id__in=lab_request_ids)}
+                    created = [stored[lab_request_id] for lab_request_id in lab_request_ids]
+                if completed_ids:
+                    cls.complete_lab_requests(completed_ids, now)
+        except IntegrityError as e:
+            if is_duplicate_key(e, 'lab_request_id'):
+                raise ValidationError({'lab_request': 'A report already exists for this lab request'})
+            raise
+        for report in created:
+            report._loaded_status = report.status
+        return created
 
     def get_patient_info(self):
         """Get formatted patient information"""
-        if (self.lab_request and 
-            hasattr(self.lab_request, 'appointment') and 
-            hasattr(self.lab_request.appointment, 'patient') and
-            hasattr(self.lab_request.appointment.patient, 'full_name')):
-            return f"{self.lab_request.appointment.patient.full_name}"
+        # The lab request, its appointment and the patient are all required relations
+        if self.lab_request_id is not None:
+            return self.lab_request.appointment.patient.name
         return "Unknown Patient"
 
     def get_test_info(self):
         """Get formatted test information"""
-        if self.lab_request:
-            test_name = self.lab_request.test_name if hasattr(self.lab_request, 'test_name') else "Unknown Test"
-            test_type = self.lab_request.get_test_type_display() if hasattr(self.lab_request, 'get_test_type_display') else "Unknown Type"
-            return f"{test_name} ({test_type})"
+        if self.lab_request_id is not None:
+            return self.lab_request.get_test_info()
         return "Unknown Test"
 
     def get_doctor_info(self):
         """Get formatted doctor information"""
-        if (self.lab_request and 
-            hasattr(self.lab_request, 'doctor') and 
-            hasattr(self.lab_request.doctor, 'full_name')):
+        if self.lab_request_id is not None:
             return f"Dr. {self.lab_request.doctor.full_name}"
         return "Unknown Doctor"
 
+    @cached_property
     def is_overdue(self):
         """Check if report is overdue"""
         if self.status in ['PENDING', 'IN_PROGRESS']:
             # Consider overdue if pending for more than 24 hours for urgent, 72 hours for routine
-            time_limit = 24 if self.priority in ['URGENT', 'STAT'] else 72
+            time_limit = self.URGENT_OVERDUE_HOURS if self.is_urgent else self.ROUTINE_OVERDUE_HOURS
             time_elapsed = (timezone.now() - self.created_at).total_seconds() / 3600
             return time_elapsed > time_limit
         return False
 
+    @classmethod
+    def overdue_q(cls, now):
+        """Condition matching is_overdue, for filtering in the database"""
+        urgent = Q(priority__in=cls.URGENT_PRIORITIES)
+        return Q(status__in=['PENDING', 'IN_PROGRESS']) & (
+            (urgent & Q(created_at__lt=now - timedelta(hours=cls.URGENT_OVERDUE_HOURS))) |
+            (~urgent & Q(created_at__lt=now - timedelta(hours=cls.ROUTINE_OVERDUE_HOURS)))
+        )
+
+    @classmethod
+    def completable_q(cls):
+        """Open reports that already carry the results clean() requires of a completed one"""
+        has_results = Q(results__isnull=False) & ~Q(results='')
+        has_file = Q(result_file__isnull=False) & ~Q(result_file='')
+        return (
+            Q(status__in=['PENDING', 'IN_PROGRESS']) &
+            Q(result_status__isnull=False) & ~Q(result_status='') &
+            (has_results | has_file)
+        )
+
+    @classmethod
+    def bulk_mark_completed(cls, report_ids):
+        """Complete many reports in one UPDATE (plus one for their lab requests); returns the completed ids"""
+        # update() bypasses save() and full_clean(); completable_q() stands in for the
+        # status and results checks, and reports that fail it are left untouched
+        now = timezone.now()
+        with transaction.atomic():
+            rows = list(
+                cls.objects.filter(cls.completable_q(), pk__in=report_ids)
+                .select_for_update().values_list('pk', 'lab_request_id')
+            )
+            completed_ids = [pk for pk, _ in rows]
+            if completed_ids:
+                cls.objects.filter(pk__in=completed_ids).update(
+                    status='COMPLETED', completed_date=now, updated_at=now
+                )
+                cls.complete_lab_requests([lab_request_id for _, lab_request_id in rows], now)
+        return completed_ids
+
     def can_be_verified(self):
         """Check if report can be verified"""
-        return self.status == 'COMPLETED' and not self.verified_by
+        return self.status == 'COMPLETED' and self.verified_by_id is None
 
     def mark_verified(self, verified_by, notes=""):
         """Mark report as verified by doctor"""
@@ -368,7 +543,11 @@ class LabReport(models.Model):
             self.critical_result_acknowledged = True
             self.critical_result_acknowledged_by = acknowledged_by
             self.critical_result_acknowledged_date = timezone.now()
-            self.save()
+            # Only the acknowledgement columns change, so there is nothing for clean() to check
+            self.save(update_fields=[
+                'critical_result_acknowledged', 'critical_result_acknowledged_by',
+                'critical_result_acknowledged_date', 'updated_at',
+            ], skip_validation=True)
 
     def get_turnaround_time(self):
         """Calculate turnaround time in hours"""
@@ -376,9 +555,10 @@ class LabReport(models.Model):
             return (self.completed_date - self.created_at).total_seconds() / 3600
         return None
 
+    @cached_property
     def is_urgent(self):
         """Check if this is an urgent test"""
-        return self.priority in ['URGENT', 'STAT']
+        return self.priority in self.URGENT_PRIORITIES
 
     def __str__(self):
         patient_info = self.get_patient_info()
@@ -477,8 +657,8 @@ class LabEquipment(models.Model):
     )
     
     # System fields
-    created_at = models.DateTimeField(default=timezone.now)
-    updated_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     notes = models.TextField(
         blank=True,
@@ -499,35 +679,49 @@ class LabEquipment(models.Model):
     def clean(self):
         """Lab equipment validation"""
         errors = {}
+        today = timezone.now().date()
         
         # Validate calibration dates
-        if self.calibration_due_date and self.calibration_due_date < timezone.now().date():
+        if self.calibration_due_date and self.calibration_due_date < today:
             errors['calibration_due_date'] = 'Calibration due date cannot be in the past'
         
-        if self.last_calibration_date and self.last_calibration_date > timezone.now().date():
+        if self.last_calibration_date and self.last_calibration_date > today:
             errors['last_calibration_date'] = 'Last calibration date cannot be in the future'
         
-        if self.next_maintenance_date and self.next_maintenance_date < timezone.now().date():
+        if self.next_maintenance_date and self.next_maintenance_date < today:
             errors['next_maintenance_date'] = 'Next maintenance date cannot be in the past'
         
-        if self.last_maintenance_date and self.last_maintenance_date > timezone.now().date():
+        if self.last_maintenance_date and self.last_maintenance_date > today:
             errors['last_maintenance_date'] = 'Last maintenance date cannot be in the future'
         
-        # Validate serial number format
-        if self.serial_number and LabEquipment.objects.filter(serial_number=self.serial_number).exclude(pk=self.pk).exists():
-            errors['serial_number'] = 'Equipment with this serial number already exists'
-        
         if errors:
             raise ValidationError(errors)
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+    def save(self, *args, skip_validation=False, **kwargs):
+        # Serial number uniqueness is left to the unique index rather than a SELECT beforehand.
+        # API writes arrive already checked by LabEquipmentSerializer and skip the second pass
+        if not skip_validation:
+            self.full_clean(validate_unique=False)
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError as e:
+            if is_duplicate_key(e, 'serial_number'):
+                raise ValidationError({'serial_number': 'Equipment with this serial number already exists'})
+            raise
+        self.clear_due_cache()
+
+    def clear_due_cache(self):
+        """Due dates may have changed under the memoized values"""
+        for name in EQUIPMENT_CACHED_PROPERTIES:
+            self.__dict__.pop(name, None)
 
+    @cached_property
     def needs_calibration(self):
         """Check if equipment needs calibration"""
         return self.calibration_due_date <= timezone.now().date()
 
+    @cached_property
     def needs_maintenance(self):
         """Check if equipment needs maintenance"""
         return self.next_maintenance_date and self.next_maintenance_date <= timezone.now().date()
@@ -538,7 +732,7 @@ class LabEquipment(models.Model):
 
     def get_calibration_status(self):
         """Get calibration status"""
-        if self.needs_calibration():
+        if self.needs_calibration:
             return 'OVERDUE'
         elif (self.calibration_due_date - timezone.now().date()).days <= 7:
             return 'DUE_SOON'
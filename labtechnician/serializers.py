@@ -1,31 +1,33 @@
 from rest_framework import serializers
-from django.core.exceptions import ValidationError
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
+from django.utils.functional import cached_property
 from .models import LabReport, LabEquipment
 
 class LabReportSerializer(serializers.ModelSerializer):
-    patient_info = serializers.SerializerMethodField(read_only=True)
-    test_info = serializers.SerializerMethodField(read_only=True)
-    doctor_info = serializers.SerializerMethodField(read_only=True)
+    patient_info = serializers.CharField(source='get_patient_info', read_only=True)
+    test_info = serializers.CharField(source='get_test_info', read_only=True)
+    doctor_info = serializers.CharField(source='get_doctor_info', read_only=True)
     is_overdue = serializers.BooleanField(read_only=True)
-    turnaround_time = serializers.FloatField(read_only=True)
+    turnaround_time = serializers.FloatField(source='get_turnaround_time', read_only=True)
     can_be_verified = serializers.BooleanField(read_only=True)
     is_urgent = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = LabReport
-        fields = '__all__'
+        fields = [
+            'id', 'patient_info', 'test_info', 'doctor_info', 'is_overdue', 'turnaround_time',
+            'can_be_verified', 'is_urgent',
+            'result_file', 'results', 'comments', 'status', 'result_status', 'priority',
+            'test_date', 'completed_date', 'verification_date', 'verification_notes',
+            'normal_range_min', 'normal_range_max', 'measured_value', 'unit',
+            'is_quality_controlled', 'quality_control_notes', 'instrument_used',
+            'created_at', 'updated_at', 'is_critical_result', 'critical_result_acknowledged',
+            'critical_result_acknowledged_date', 'lab_request', 'technician', 'verified_by',
+            'critical_result_acknowledged_by'
+        ]
         read_only_fields = ['created_at', 'updated_at', 'critical_result_acknowledged_date']
     
-    def get_patient_info(self, obj):
-        return obj.get_patient_info()
-    
-    def get_test_info(self, obj):
-        return obj.get_test_info()
-    
-    def get_doctor_info(self, obj):
-        return obj.get_doctor_info()
-    
     def validate_technician(self, value):
         if value.role != 'LABTECH':
             raise serializers.ValidationError('Only lab technicians can be assigned to lab reports')
@@ -72,38 +74,76 @@ class LabReportSerializer(serializers.ModelSerializer):
         
         return data
 
+class LabReportListSerializer(LabReportSerializer):
+    """Read-only list rows without the long free-text fields and the result file"""
+
+    class Meta(LabReportSerializer.Meta):
+        fields = None
+        exclude = ['results', 'comments', 'verification_notes', 'quality_control_notes', 'result_file']
+
 class LabEquipmentSerializer(serializers.ModelSerializer):
     needs_calibration = serializers.BooleanField(read_only=True)
     needs_maintenance = serializers.BooleanField(read_only=True)
     is_operational = serializers.BooleanField(read_only=True)
-    calibration_status = serializers.CharField(read_only=True)
+    calibration_status = serializers.CharField(source='get_calibration_status', read_only=True)
     
     class Meta:
         model = LabEquipment
-        fields = '__all__'
+        fields = [
+            'id', 'needs_calibration', 'needs_maintenance', 'is_operational', 'calibration_status',
+            'name', 'model', 'serial_number', 'manufacturer', 'status', 'calibration_due_date',
+            'calibration_frequency', 'last_calibration_date', 'last_maintenance_date',
+            'next_maintenance_date', 'location', 'is_critical_equipment', 'created_at',
+            'updated_at', 'notes'
+        ]
         read_only_fields = ['created_at', 'updated_at']
-    
-    def validate_serial_number(self, value):
-        if LabEquipment.objects.filter(serial_number=value).exclude(pk=self.instance.pk if self.instance else None).exists():
-            raise serializers.ValidationError('Equipment with this serial number already exists')
-        return value
+        extra_kwargs = {
+            # Duplicates are rejected by the unique index on write (see LabEquipment.save);
+            # only the format check is kept from the model field
+            'serial_number': {'validators': LabEquipment._meta.get_field('serial_number').validators},
+            # DRF turns the model's MinLengthValidator into min_length and drops its message
+            'name': {'error_messages': {'min_length': 'Name must be at least 2 characters long'}},
+        }
+    
+    def create(self, validated_data):
+        equipment = LabEquipment(**validated_data)
+        self._save_equipment(equipment)
+        return equipment
+    
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items(): setattr(instance, attr, value)
+        self._save_equipment(instance)
+        return instance
+    
+    def _save_equipment(self, equipment):
+        # The field validators above already ran, so the model's full_clean pass is skipped
+        try:
+            equipment.save(skip_validation=True)
+        except DjangoValidationError as e:
+            # Raised by LabEquipment.save for a serial number that is already taken
+            raise serializers.ValidationError(e.message_dict)
+    
+    @cached_property
+    def today(self):
+        # Shared by the date validators below, so one validation pass reads the clock once
+        return timezone.now().date()
     
     def validate_calibration_due_date(self, value):
-        if value < timezone.now().date():
+        if value < self.today:
             raise serializers.ValidationError('Calibration due date cannot be in the past')
         return value
     
     def validate_last_calibration_date(self, value):
-        if value and value > timezone.now().date():
+        if value and value > self.today:
             raise serializers.ValidationError('Last calibration date cannot be in the future')
         return value
     
     def validate_next_maintenance_date(self, value):
-        if value and value < timezone.now().date():
+        if value and value < self.today:
             raise serializers.ValidationError('Next maintenance date cannot be in the past')
         return value
     
     def validate_last_maintenance_date(self, value):
-        if value and value > timezone.now().date():
+        if value and value > self.today:
             raise serializers.ValidationError('Last maintenance date cannot be in the future')
         return value
\ No newline at end of file
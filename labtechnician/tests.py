@@ -1,3 +1,95 @@
+import datetime
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from adminapp.models import Staff
+from doctor.models import LabRequest
+from receptionist.models import Appointment, Patient
+from .models import LabEquipment, LabReport
+
+
+def make_staff(role, email):
+    staff = Staff(full_name=f'Test {role.title()}', email=email, role=role)
+    staff.set_password('Passw0rdX')
+    staff.save()
+    return staff
+
+
+class BulkCreateReportsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        receptionist = make_staff('RECEPTIONIST', 'reception@hospital.com')
+        doctor = make_staff('DOCTOR', 'doctor@hospital.com')
+        cls.technician = make_staff('LABTECH', 'labtech@hospital.com')
+        patient = Patient.objects.create(
+            name='John Doe', age=30, gender='MALE', address='123 Long Street Address',
+            phone='9876543210', created_by=receptionist,
+        )
+        appointment = Appointment.objects.create(
+            patient=patient, doctor=doctor, created_by=receptionist,
+            appointment_date=datetime.date.today() + datetime.timedelta(days=1),
+            appointment_time=datetime.time(10, 0), purpose='Follow-up consultation',
+        )
+        Appointment.objects.filter(pk=appointment.pk).update(status='COMPLETED')
+        appointment.refresh_from_db()
+        cls.lab_requests = [
+            LabRequest.objects.create(appointment=appointment, doctor=doctor, test_name=name, test_type='BLOOD_TEST')
+            for name in ('CBC count', 'Lipid profile', 'Thyroid panel')
+        ]
+
+    def report(self, lab_request, **fields):
+        return LabReport(lab_request=lab_request, technician=self.technician, **fields)
+
+    def test_valid_batch_is_inserted_and_completes_lab_requests(self):
+        first, second, _ = self.lab_requests
+        created = LabReport.bulk_create_reports([
+            self.report(first, status='COMPLETED', results='All values within range', result_status='NORMAL'),
+            self.report(second),
+        ])
+        self.assertEqual([report.pk for report in created], list(LabReport.objects.order_by('pk').values_list('pk', flat=True)))
+        self.assertIsNotNone(created[0].completed_date)
+        statuses = dict(LabRequest.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[first.pk], 'COMPLETED')
+        self.assertNotEqual(statuses[second.pk], 'COMPLETED')
+
+    def test_invalid_rows_are_reported_and_nothing_is_written(self):
+        first, second, third = self.lab_requests
+        LabRequest.objects.filter(pk=third.pk).update(status='CANCELLED')
+        with self.assertRaises(ValidationError) as raised:
+            LabReport.bulk_create_reports([
+                self.report(first, status='COMPLETED', results='All values within range', result_status='NORMAL'),
+                # Completed without results or a result status
+                self.report(second, status='COMPLETED'),
+                self.report(third),
+                self.report(first),
+            ])
+        errors = raised.exception.message_dict
+        self.assertEqual(sorted(errors), [1, 2, 3])
+        self.assertIn('results', str(errors[1]))
+        self.assertIn('cancelled', str(errors[2]))
+        self.assertIn('already exists', str(errors[3]))
+        self.assertFalse(LabReport.objects.exists())
+        self.assertFalse(LabRequest.objects.filter(status='COMPLETED').exists())
+
+    def test_ids_are_read_back_when_backend_cannot_return_them(self):
+        # MySQL leaves the pks of a bulk insert unset
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            created = LabReport.bulk_create_reports([self.report(lab_request) for lab_request in self.lab_requests])
+        stored = dict(LabReport.objects.values_list('lab_request_id', 'pk'))
+        self.assertEqual([report.pk for report in created], [stored[lab_request.pk] for lab_request in self.lab_requests])
+
+
+class LabEquipmentTests(TestCase):
+    def make_equipment(self, serial_number):
+        return LabEquipment.objects.create(
+            name='Centrifuge', model='CF-200', serial_number=serial_number, manufacturer='Acme Labs',
+            location='Lab 1', calibration_due_date=datetime.date.today() + datetime.timedelta(days=30),
+        )
+
+    def test_duplicate_serial_number_is_a_validation_error(self):
+        self.make_equipment('CF-2024-001')
+        with self.assertRaisesMessage(ValidationError, 'Equipment with this serial number already exists'):
+            self.make_equipment('CF-2024-001')
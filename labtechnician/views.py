@@ -2,17 +2,52 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Q
+from django.utils.functional import cached_property
+from django.db.models import Q, F
+from CMS.api import PaginatedActionMixin
 from .models import LabReport, LabEquipment
-from .serializers import LabReportSerializer, LabEquipmentSerializer
-from rest_framework.permissions import IsAuthenticated
-class LabReportViewSet(viewsets.ModelViewSet):
-    queryset = LabReport.objects.all()
+from .serializers import LabReportSerializer, LabReportListSerializer, LabEquipmentSerializer
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
+
+# Report columns plus the few joined columns patient_info, test_info and doctor_info read
+LAB_REPORT_READ_FIELDS = (
+    'id', 'lab_request', 'technician', 'result_file', 'results', 'comments', 'status',
+    'result_status', 'priority', 'test_date', 'completed_date', 'verified_by',
+    'verification_date', 'verification_notes', 'normal_range_min', 'normal_range_max',
+    'measured_value', 'unit', 'is_quality_controlled', 'quality_control_notes',
+    'instrument_used', 'created_at', 'updated_at', 'is_critical_result',
+    'critical_result_acknowledged', 'critical_result_acknowledged_by',
+    'critical_result_acknowledged_date',
+    'lab_request__test_name', 'lab_request__test_type', 'lab_request__appointment',
+    'lab_request__doctor', 'lab_request__appointment__patient',
+    'lab_request__appointment__patient__name', 'lab_request__doctor__full_name',
+)
+
+# Columns the slim maintenance/calibration due lists return
+EQUIPMENT_DUE_FIELDS = (
+    'id', 'name', 'serial_number', 'location', 'status', 'is_critical_equipment',
+    'calibration_due_date', 'next_maintenance_date',
+)
+
+class LabReportViewSet(PaginatedActionMixin, viewsets.ModelViewSet):
+    # patient_info, test_info and doctor_info read these relations on every row
+    queryset = LabReport.objects.select_related('lab_request__appointment__patient', 'lab_request__doctor')
     serializer_class = LabReportSerializer
     permission_classes = [IsAuthenticated]
+    # Collection endpoints return the slim rows; single reports keep every field
+    list_actions = ('list', 'pending_reports', 'critical_results', 'overdue_reports')
+    
+    def get_serializer_class(self):
+        if self.action in self.list_actions:
+            return LabReportListSerializer
+        return super().get_serializer_class()
     
     def get_queryset(self):
-        queryset = LabReport.objects.all()
+        queryset = super().get_queryset()
+        if self.request.method in SAFE_METHODS:
+            queryset = queryset.only(*LAB_REPORT_READ_FIELDS)
+        if self.action in self.list_actions:
+            queryset = queryset.defer(*LabReportListSerializer.Meta.exclude)
         technician_id = self.request.query_params.get('technician_id')
         status = self.request.query_params.get('status')
         priority = self.request.query_params.get('priority')
@@ -35,6 +70,19 @@ class LabReportViewSet(viewsets.ModelViewSet):
         lab_report.save()
         return Response({'status': 'Lab report marked as completed'})
     
+    @action(detail=False, methods=['post'])
+    def bulk_mark_completed(self, request):
+        """Complete a list of reports in one UPDATE; reports not ready to complete are skipped"""
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = {int(report_id) for report_id in ids}
+        except (TypeError, ValueError):
+            return Response({'error': 'ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        completed_ids = LabReport.bulk_mark_completed(ids)
+        return Response({'completed': sorted(completed_ids), 'skipped': sorted(ids.difference(completed_ids))})
+    
     @action(detail=True, methods=['post'])
     def mark_in_progress(self, request, pk=None):
         lab_report = self.get_object()
@@ -53,27 +101,40 @@ class LabReportViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def pending_reports(self, request):
-        pending_reports = LabReport.objects.filter(status__in=['PENDING', 'IN_PROGRESS'])
-        serializer = self.get_serializer(pending_reports, many=True)
-        return Response(serializer.data)
+        pending_reports = self.get_queryset().filter(status__in=['PENDING', 'IN_PROGRESS'])
+        return self.paginated_response(pending_reports)
     
     @action(detail=False, methods=['get'])
     def critical_results(self, request):
-        critical_reports = LabReport.objects.filter(is_critical_result=True, critical_result_acknowledged=False)
-        serializer = self.get_serializer(critical_reports, many=True)
-        return Response(serializer.data)
+        critical_reports = self.get_queryset().filter(is_critical_result=True, critical_result_acknowledged=False)
+        if request.query_params.get('slim'):
+            # Plain dicts straight from the cursor: no model instances and no serializer
+            critical_reports = critical_reports.values(
+                'id', 'status', 'priority', 'measured_value', 'unit', 'created_at',
+                test_name=F('lab_request__test_name'),
+                patient_name=F('lab_request__appointment__patient__name'),
+            )
+            page = self.paginate_queryset(critical_reports)
+            if page is not None:
+                return self.get_paginated_response(page)
+            return Response(list(critical_reports))
+        return self.paginated_response(critical_reports)
     
     @action(detail=False, methods=['get'])
     def overdue_reports(self, request):
-        overdue_reports = [report for report in LabReport.objects.filter(status__in=['PENDING', 'IN_PROGRESS']) if report.is_overdue()]
-        serializer = self.get_serializer(overdue_reports, many=True)
-        return Response(serializer.data)
+        overdue_reports = self.get_queryset().filter(LabReport.overdue_q(timezone.now()))
+        return self.paginated_response(overdue_reports)
 
 class LabEquipmentViewSet(viewsets.ModelViewSet):
     queryset = LabEquipment.objects.all()
     serializer_class = LabEquipmentSerializer
     permission_classes = [IsAuthenticated]
     
+    @cached_property
+    def today(self):
+        """Today's date, read once per request for the due-date filters"""
+        return timezone.now().date()
+    
     def get_queryset(self):
         queryset = LabEquipment.objects.all()
         status = self.request.query_params.get('status')
@@ -81,8 +142,8 @@ class LabEquipmentViewSet(viewsets.ModelViewSet):
         needs_maintenance = self.request.query_params.get('needs_maintenance')
         
         if status: queryset = queryset.filter(status=status)
-        if needs_calibration == 'true': queryset = queryset.filter(calibration_due_date__lte=timezone.now().date())
-        if needs_maintenance == 'true': queryset = queryset.filter(next_maintenance_date__lte=timezone.now().date())
+        if needs_calibration == 'true': queryset = queryset.filter(calibration_due_date__lte=self.today)
+        if needs_maintenance == 'true': queryset = queryset.filter(next_maintenance_date__lte=self.today)
         
         return queryset
     
@@ -112,12 +173,16 @@ class LabEquipmentViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def maintenance_due(self, request):
-        due_equipment = LabEquipment.objects.filter(next_maintenance_date__lte=timezone.now().date())
+        due_equipment = LabEquipment.objects.filter(next_maintenance_date__lte=self.today)
+        if request.query_params.get('slim'):
+            return Response(list(due_equipment.values(*EQUIPMENT_DUE_FIELDS)))
         serializer = self.get_serializer(due_equipment, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def calibration_due(self, request):
-        due_equipment = LabEquipment.objects.filter(calibration_due_date__lte=timezone.now().date())
+        due_equipment = LabEquipment.objects.filter(calibration_due_date__lte=self.today)
+        if request.query_params.get('slim'):
+            return Response(list(due_equipment.values(*EQUIPMENT_DUE_FIELDS)))
         serializer = self.get_serializer(due_equipment, many=True)
         return Response(serializer.data)
\ No newline at end of file
@@ -25,7 +25,7 @@ class MedicineIssueAdmin(admin.ModelAdmin):
     form = MedicineIssueAdminForm
     list_display = ['prescription', 'pharmacist', 'status', 'issued', 'payment_status', 'issue_date', 'is_controlled_substance']
     list_filter = ['status', 'payment_status', 'issued', 'is_controlled_substance', 'issue_date']
-    search_fields = ['prescription__medicine_name', 'prescription__appointment__patient__full_name']
+    search_fields = ['prescription__medicine_name', 'prescription__appointment__patient__name']
     readonly_fields = ['created_at', 'updated_at']
     fieldsets = (
         ('Prescription Info', {'fields': ('prescription', 'pharmacist')}),
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-15 23:08
+
+import django.core.validators
+import re
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacist', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='medicineinventory',
+            name='batch_number',
+            field=models.CharField(help_text='Batch number', max_length=50, validators=[django.core.validators.RegexValidator(message='Batch number must be 3-50 characters (letters, numbers, hyphens)', regex=re.compile('^[A-Z0-9\\-]{3,50}$'))]),
+        ),
+        migrations.AlterField(
+            model_name='medicineinventory',
+            name='medicine_name',
+            field=models.CharField(help_text='Medicine name', max_length=100, validators=[django.core.validators.RegexValidator(message='Medicine name can only contain letters, numbers, spaces, hyphens, dots and parentheses', regex=re.compile('^[a-zA-Z0-9\\s\\-\\.\\(\\)]{2,100}$'))]),
+        ),
+        migrations.AlterField(
+            model_name='medicineissue',
+            name='batch_number',
+            field=models.CharField(blank=True, help_text='Medicine batch number', max_length=50, null=True, validators=[django.core.validators.RegexValidator(message='Batch number must be 3-50 characters (letters, numbers, hyphens)', regex=re.compile('^[A-Z0-9\\-]{3,50}$'))]),
+        ),
+    ]
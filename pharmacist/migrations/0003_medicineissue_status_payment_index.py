@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-15 23:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapp', '0004_staff_name_idx'),
+        ('doctor', '0004_diagnosis_length_checks'),
+        ('pharmacist', '0002_precompiled_validators'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='medicineissue',
+            name='pharmacist__status_136fb0_idx',
+        ),
+        migrations.AddIndex(
+            model_name='medicineissue',
+            index=models.Index(fields=['status', 'payment_status', 'issue_date'], name='mi_status_pay_date_idx'),
+        ),
+    ]
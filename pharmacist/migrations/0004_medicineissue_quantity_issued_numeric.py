@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-15 23:10
+
+import re
+
+from django.db import migrations, models
+
+
+def parse_quantities(apps, schema_editor):
+    MedicineIssue = apps.get_model('pharmacist', 'MedicineIssue')
+    # One UPDATE per distinct quantity text rather than per row
+    texts = MedicineIssue.objects.filter(quantity_issued__isnull=False).order_by().values_list('quantity_issued', flat=True).distinct()
+    for text in list(texts):
+        quantity_match = re.search(r'(\d+)', text)
+        if quantity_match:
+            MedicineIssue.objects.filter(quantity_issued=text).update(quantity_issued_numeric=int(quantity_match.group(1)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacist', '0003_medicineissue_status_payment_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medicineissue',
+            name='quantity_issued_numeric',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Leading number of the quantity issued', null=True),
+        ),
+        migrations.RunPython(parse_quantities, migrations.RunPython.noop),
+    ]
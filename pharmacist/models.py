@@ -1,8 +1,15 @@
+import re
+
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator, MinLengthValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+# Leading number of a free-text quantity such as "30 tablets"
+QUANTITY_NUMBER_RE = re.compile(r'(\d+)')
+# Compiled at import and handed to the field validators, which would otherwise compile lazily
+BATCH_NUMBER_RE = re.compile(r'^[A-Z0-9\-]{3,50}$')
+MEDICINE_NAME_RE = re.compile(r'^[a-zA-Z0-9\s\-\.\(\)]{2,100}$')
 
 class MedicineIssue(models.Model):
     STATUS_CHOICES = [
@@ -64,13 +71,23 @@ class MedicineIssue(models.Model):
         help_text="Actual quantity issued (e.g., 28 tablets, 100ml)"
     )
     
+    # Deliberately denormalised: the free-text quantity stays the input clients send, and its
+    # leading number is kept here so prices and reports can use it in SQL. Written by save()
+    # whenever the text changes
+    quantity_issued_numeric = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Leading number of the quantity issued"
+    )
+    
     batch_number = models.CharField(
         max_length=50,
         blank=True,
         null=True,
         validators=[
             RegexValidator(
-                regex=r'^[A-Z0-9\-]{3,50}$',
+                regex=BATCH_NUMBER_RE,
                 message='Batch number must be 3-50 characters (letters, numbers, hyphens)'
             )
         ],
@@ -149,10 +166,24 @@ class MedicineIssue(models.Model):
         indexes = [
             models.Index(fields=['prescription']),
             models.Index(fields=['pharmacist']),
-            models.Index(fields=['status']),
+            # Pending/unpaid scans filter on status and payment status together;
+            # this also serves status-only filters, so there is no separate status index
+            models.Index(fields=['status', 'payment_status', 'issue_date'], name='mi_status_pay_date_idx'),
             models.Index(fields=['issue_date']),
         ]
 
+    # Status as last read from or written to the database, for transition checks without a re-read
+    _loaded_status = None
+    # Quantity text as last read or parsed, so saves that leave it alone skip the parse
+    _loaded_quantity_issued = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_quantity_issued = instance.__dict__.get('quantity_issued')
+        return instance
+
     def clean(self):
         """Comprehensive medicine issue validation"""
         errors = {}
@@ -170,14 +201,14 @@ class MedicineIssue(models.Model):
         
         # Validate status transitions
         if self.pk:  # Only for existing instances
-            try:
-                original = MedicineIssue.objects.get(pk=self.pk)
-                if original.status == 'ISSUED' and self.status != 'ISSUED':
-                    errors['status'] = 'Cannot change status from issued'
-                if original.status == 'CANCELLED' and self.status != 'CANCELLED':
-                    errors['status'] = 'Cannot change status from cancelled'
-            except MedicineIssue.DoesNotExist:
-                pass
+            original_status = self._loaded_status
+            if original_status is None:
+                # Built by hand or loaded with status deferred; fall back to reading the row
+                original_status = MedicineIssue.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+            if original_status == 'ISSUED' and self.status != 'ISSUED':
+                errors['status'] = 'Cannot change status from issued'
+            if original_status == 'CANCELLED' and self.status != 'CANCELLED':
+                errors['status'] = 'Cannot change status from cancelled'
         
         # Validate issued status
         if self.issued and not self.issue_date:
@@ -219,30 +250,31 @@ class MedicineIssue(models.Model):
         if errors:
             raise ValidationError(errors)
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, skip_validation=False, **kwargs):
         """Override save to run validations and auto-calculate fields"""
-        self.full_clean()
+        # Payment and instruction flag updates skip the full pass and its relation lookups
+        if not skip_validation:
+            self.full_clean()
+        
+        # Re-parse the quantity only when its text is being written with a new value
+        update_fields = kwargs.get('update_fields')
+        writes_quantity = update_fields is None or 'quantity_issued' in update_fields
+        if writes_quantity and self.quantity_issued != self._loaded_quantity_issued:
+            self.quantity_issued_numeric = self.parse_quantity(self.quantity_issued)
+            self._loaded_quantity_issued = self.quantity_issued
         
         # Auto-calculate total price if unit price and quantity are set
-        if self.unit_price > 0 and self.quantity_issued:
-            try:
-                # Extract numeric value from quantity_issued (e.g., "30 tablets" -> 30)
-                import re
-                quantity_match = re.search(r'(\d+)', self.quantity_issued)
-                if quantity_match:
-                    quantity = int(quantity_match.group(1))
-                    self.total_price = self.unit_price * quantity
-            except (ValueError, TypeError):
-                # If parsing fails, keep the existing total_price
-                pass
+        if self.unit_price > 0 and self.quantity_issued_numeric is not None:
+            self.total_price = self.unit_price * self.quantity_issued_numeric
         
         # Auto-set issued based on status
         if self.status == 'ISSUED':
             self.issued = True
+            now = timezone.now()
             if not self.issue_date:
-                self.issue_date = timezone.now().date()
+                self.issue_date = now.date()
             if not self.issue_time:
-                self.issue_time = timezone.now().time()
+                self.issue_time = now.time()
         else:
             self.issued = False
         
@@ -254,8 +286,32 @@ class MedicineIssue(models.Model):
         self.updated_at = timezone.now()
         
         super().save(*args, **kwargs)
+        self._loaded_status = self.status
+
+    @staticmethod
+    def parse_quantity(quantity_issued):
+        """Leading number of a free-text quantity ("30 tablets" -> 30), or None"""
+        quantity_match = QUANTITY_NUMBER_RE.search(quantity_issued or '')
+        return int(quantity_match.group(1)) if quantity_match else None
+
+    def get_patient_info(self):
+        """Get formatted patient information"""
+        # The prescription, its appointment and the patient are all required relations
+        if self.prescription_id is not None:
+            return self.prescription.appointment.patient.name
+        return "Unknown Patient"
+
+    def get_medicine_info(self):
+        """Get formatted medicine information"""
+        if self.prescription_id is not None:
+            return str(self.prescription)
+        return "Unknown Medicine"
 
-    # ... keep all your existing methods (get_patient_info, get_medicine_info, etc.) as they are ...
+    def get_prescription_info(self):
+        """Get the prescribed medicine and dosage"""
+        if self.prescription_id is not None:
+            return f"{self.prescription.medicine_name} - {self.prescription.dosage}"
+        return "Unknown Prescription"
 
 
 class MedicineInventory(models.Model):
@@ -274,7 +330,7 @@ class MedicineInventory(models.Model):
         max_length=100,
         validators=[
             RegexValidator(
-                regex=r'^[a-zA-Z0-9\s\-\.\(\)]{2,100}$',
+                regex=MEDICINE_NAME_RE,
                 message='Medicine name can only contain letters, numbers, spaces, hyphens, dots and parentheses'
             )
         ],
@@ -299,7 +355,7 @@ class MedicineInventory(models.Model):
         max_length=50,
         validators=[
             RegexValidator(
-                regex=r'^[A-Z0-9\-]{3,50}$',
+                regex=BATCH_NUMBER_RE,
                 message='Batch number must be 3-50 characters (letters, numbers, hyphens)'
             )
         ],
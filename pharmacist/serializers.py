@@ -4,9 +4,9 @@ from django.utils import timezone
 from .models import MedicineIssue, MedicineInventory
 
 class MedicineIssueSerializer(serializers.ModelSerializer):
-    patient_info = serializers.SerializerMethodField(read_only=True)
-    medicine_info = serializers.SerializerMethodField(read_only=True)
-    prescription_info = serializers.SerializerMethodField(read_only=True)
+    patient_info = serializers.CharField(source='get_patient_info', read_only=True)
+    medicine_info = serializers.CharField(source='get_medicine_info', read_only=True)
+    prescription_info = serializers.CharField(source='get_prescription_info', read_only=True)
     needs_attention = serializers.BooleanField(read_only=True)
     
     class Meta:
@@ -14,15 +14,6 @@ class MedicineIssueSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['created_at', 'updated_at']
     
-    def get_patient_info(self, obj):
-        return obj.get_patient_info()
-    
-    def get_medicine_info(self, obj):
-        return obj.get_medicine_info()
-    
-    def get_prescription_info(self, obj):
-        return f"{obj.prescription.medicine_name} - {obj.prescription.dosage}"
-    
     def validate_pharmacist(self, value):
         if value.role != 'PHARMACIST':
             raise serializers.ValidationError('Only pharmacists can issue medicines')
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:53
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_doctor_names(apps, schema_editor):
+    Appointment = apps.get_model('receptionist', 'Appointment')
+    Staff = apps.get_model('adminapp', 'Staff')
+    Appointment.objects.update(
+        doctor_name_cached=Subquery(Staff.objects.filter(pk=OuterRef('doctor_id')).values('full_name')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminapp', '0004_staff_name_idx'),
+        ('receptionist', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='doctor_name_cached',
+            field=models.CharField(blank=True, default='', editable=False, help_text="Doctor's name at the time of the last save", max_length=100),
+        ),
+        migrations.RunPython(copy_doctor_names, migrations.RunPython.noop),
+    ]
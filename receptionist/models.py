@@ -211,6 +211,8 @@ class Appointment(models.Model):
         ('CANCELLED', 'Cancelled'),
         ('NO_SHOW', 'No Show'),
     ]
+    # Booked but not yet seen
+    PENDING_STATUSES = ('SCHEDULED', 'CONFIRMED')
     
     PRIORITY_CHOICES = [
         ('LOW', 'Low'),
@@ -311,6 +313,15 @@ class Appointment(models.Model):
         null=True,
         help_text="When patient checked out"
     )
+    
+    # Copy of doctor.full_name so appointment lists render without joining Staff; kept in sync by Staff.save()
+    doctor_name_cached = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        editable=False,
+        help_text="Doctor's name at the time of the last save"
+    )
 
     class Meta:
         ordering = ['appointment_date', 'appointment_time']  # Fixed ordering to show soonest first
@@ -321,6 +332,10 @@ class Appointment(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['patient', 'doctor']),
             models.Index(fields=['priority']),
+            # Doctor-scoped views filter on date and/or status; MySQL has no partial indexes,
+            # so open urgent cases are served by the status/priority index as a whole
+            models.Index(fields=['doctor', 'appointment_date', 'status'], name='appt_doctor_date_status_idx'),
+            models.Index(fields=['doctor', 'status', 'priority'], name='appt_doctor_status_prio_idx'),
         ]
         unique_together = ['doctor', 'appointment_date', 'appointment_time']
 
@@ -402,6 +417,13 @@ class Appointment(models.Model):
             }
             self.estimated_duration = duration_map.get(self.priority, 30)
         
+        # clean() has already loaded the doctor, so the copy costs no query
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'doctor' in update_fields:
+            self.doctor_name_cached = self.doctor.full_name
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'doctor_name_cached'}
+        
         super().save(*args, **kwargs)
 
     def get_patient_info(self):
@@ -420,6 +442,10 @@ class Appointment(models.Model):
         """Check if appointment can be cancelled"""
         return self.status in ['SCHEDULED', 'CONFIRMED']
 
+    def can_start_consultation(self):
+        """Check if the doctor can start the consultation"""
+        return self.status in self.PENDING_STATUSES
+
     def mark_completed(self, actual_duration=None):
         """Mark appointment as completed"""
         if self.status != 'COMPLETED':
@@ -4,6 +4,7 @@ from django.utils import timezone
 from datetime import date, datetime
 from .models import Patient, Appointment
 from billing.models import Billing  # Import from billing app
+from CMS.api import BulkListSerializer, CachedFieldsMixin, ConstraintErrorsMixin
 
 class PatientSerializer(serializers.ModelSerializer):
     appointment_count = serializers.IntegerField(read_only=True)
@@ -130,61 +131,31 @@ class AppointmentSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'actual_duration': 'Actual duration is required for completed appointments'})
         return data
 
-class BillingSerializer(serializers.ModelSerializer):
+class BillingSerializer(CachedFieldsMixin, ConstraintErrorsMixin, serializers.ModelSerializer):
     patient_name = serializers.CharField(source='patient.full_name', read_only=True)
     patient_phone = serializers.CharField(source='patient.phone', read_only=True)
     prescription_details = serializers.CharField(source='prescription.notes', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
+    # Generated columns; declared so they render as decimal strings like the amount inputs
+    subtotal = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    total_amount = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    balance_due = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     
     class Meta:
         model = Billing
         fields = '__all__'
-        read_only_fields = ['bill_number', 'created_at', 'updated_at', 'total_amount', 'balance_due']
-    
-    def validate_consultation_fee(self, value):
-        if value < 0:
-            raise serializers.ValidationError('Consultation fee cannot be negative')
-        if value > 100000:
-            raise serializers.ValidationError('Consultation fee too high')
-        return value
-    
-    def validate_medicine_cost(self, value):
-        if value < 0:
-            raise serializers.ValidationError('Medicine cost cannot be negative')
-        if value > 1000000:
-            raise serializers.ValidationError('Medicine cost too high')
-        return value
-    
-    def validate_lab_cost(self, value):
-        if value < 0:
-            raise serializers.ValidationError('Lab cost cannot be negative')
-        if value > 1000000:
-            raise serializers.ValidationError('Lab cost too high')
-        return value
-    
-    def validate_other_charges(self, value):
-        if value < 0:
-            raise serializers.ValidationError('Other charges cannot be negative')
-        if value > 100000:
-            raise serializers.ValidationError('Other charges too high')
-        return value
-    
-    def validate_discount(self, value):
-        if value < 0:
-            raise serializers.ValidationError('Discount cannot be negative')
-        return value
-    
-    def validate_tax_amount(self, value):
-        if value < 0:
-            raise serializers.ValidationError('Tax amount cannot be negative')
-        if value > 100000:
-            raise serializers.ValidationError('Tax amount too high')
-        return value
-    
-    def validate_amount_paid(self, value):
-        if value < 0:
-            raise serializers.ValidationError('Amount paid cannot be negative')
-        return value
+        list_serializer_class = BulkListSerializer
+        read_only_fields = ['bill_number', 'created_at', 'updated_at']
+        # Non-negative minimums come from the model validators; upper limits are this endpoint's own
+        extra_kwargs = {
+            'consultation_fee': {'max_value': 100000, 'error_messages': {'min_value': 'Consultation fee cannot be negative', 'max_value': 'Consultation fee too high'}},
+            'medicine_cost': {'max_value': 1000000, 'error_messages': {'min_value': 'Medicine cost cannot be negative', 'max_value': 'Medicine cost too high'}},
+            'lab_cost': {'max_value': 1000000, 'error_messages': {'min_value': 'Lab cost cannot be negative', 'max_value': 'Lab cost too high'}},
+            'other_charges': {'max_value': 100000, 'error_messages': {'min_value': 'Other charges cannot be negative', 'max_value': 'Other charges too high'}},
+            'discount': {'error_messages': {'min_value': 'Discount cannot be negative'}},
+            'tax_amount': {'max_value': 100000, 'error_messages': {'min_value': 'Tax amount cannot be negative', 'max_value': 'Tax amount too high'}},
+            'amount_paid': {'error_messages': {'min_value': 'Amount paid cannot be negative'}},
+        }
     
     def validate_due_date(self, value):
         if value and value < timezone.now().date():
@@ -221,11 +221,7 @@ class BillingViewSet(viewsets.ModelViewSet):
         # Filter overdue bills
         overdue = self.request.query_params.get('overdue')
         if overdue and overdue.lower() == 'true':
-            today = timezone.now().date()
-            queryset = queryset.filter(
-                payment_status__in=['PENDING', 'PARTIAL'],
-                due_date__lt=today
-            )
+            queryset = Billing.get_overdue_bills(queryset)
         
         # Search by bill number or patient name
         search = self.request.query_params.get('search')
@@ -310,26 +306,16 @@ class BillingViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get billing statistics"""
-        total_revenue = Billing.get_total_revenue()
-        pending_bills = Billing.get_pending_bills().count()
-        overdue_bills = Billing.get_overdue_bills().count()
-        paid_bills = Billing.objects.filter(payment_status='PAID').count()
-        
-        # Today's revenue
-        today = timezone.now().date()
-        today_revenue = Billing.get_total_revenue(start_date=today)
-        
-        # This month's revenue
-        month_start = today.replace(day=1)
-        month_revenue = Billing.get_total_revenue(start_date=month_start)
+        # Counts plus total/today/month revenue in one aggregate query
+        stats = Billing.get_stats()
         
         return Response({
-            'total_revenue': float(total_revenue),
-            'today_revenue': float(today_revenue),
-            'month_revenue': float(month_revenue),
-            'pending_bills': pending_bills,
-            'overdue_bills': overdue_bills,
-            'paid_bills': paid_bills
+            'total_revenue': float(stats['total_revenue']),
+            'today_revenue': float(stats['today_revenue']),
+            'month_revenue': float(stats['month_revenue']),
+            'pending_bills': stats['pending_bills'],
+            'overdue_bills': stats['overdue_bills'],
+            'paid_bills': stats['paid_bills']
         })
     
     @action(detail=False, methods=['get'])
@@ -349,7 +335,11 @@ class BillingViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get all overdue bills"""
-        overdue_bills = Billing.get_overdue_bills()
+        # Narrow the viewset queryset so the list keeps its eager loading and filters
+        overdue_bills = Billing.get_overdue_bills(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(overdue_bills)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
         serializer = self.get_serializer(overdue_bills, many=True)
         return Response(serializer.data)
     